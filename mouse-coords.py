@@ -2,6 +2,9 @@
 """
 Prints OS-level screen coordinates in real time.
 Uses ctypes + CoreGraphics — no extra packages needed.
+Listens for mouse-move events via a CGEventTap, so nothing runs while the
+mouse is still. Falls back to polling if the tap can't be created (the
+terminal needs Input Monitoring permission for the tap).
 Ctrl-C to stop.
 """
 import ctypes, time, sys
@@ -12,18 +15,95 @@ class CGPoint(ctypes.Structure):
 cg = ctypes.cdll.LoadLibrary(
     '/System/Library/Frameworks/CoreGraphics.framework/CoreGraphics'
 )
+cf = ctypes.cdll.LoadLibrary(
+    '/System/Library/Frameworks/CoreFoundation.framework/CoreFoundation'
+)
+
+kCGSessionEventTap         = 1
+kCGHeadInsertEventTap      = 0
+kCGEventTapOptionListenOnly = 1
+kCGEventMouseMoved         = 5
+kCGEventLeftMouseDragged   = 6
+kCGEventRightMouseDragged  = 7
+kCGEventOtherMouseDragged  = 27
+kCGEventTapDisabledByTimeout = 0xFFFFFFFE
+EVENT_MASK = ((1 << kCGEventMouseMoved) | (1 << kCGEventLeftMouseDragged) |
+              (1 << kCGEventRightMouseDragged) | (1 << kCGEventOtherMouseDragged))
+
+CGEventTapCallBack = ctypes.CFUNCTYPE(
+    ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint32, ctypes.c_void_p, ctypes.c_void_p
+)
+
 cg.CGEventCreate.restype = ctypes.c_void_p
 cg.CGEventCreate.argtypes = [ctypes.c_void_p]
 cg.CGEventGetLocation.restype = CGPoint
 cg.CGEventGetLocation.argtypes = [ctypes.c_void_p]
+cg.CGEventTapCreate.restype = ctypes.c_void_p
+cg.CGEventTapCreate.argtypes = [ctypes.c_uint32, ctypes.c_uint32, ctypes.c_uint32,
+                                ctypes.c_uint64, CGEventTapCallBack, ctypes.c_void_p]
+cg.CGEventTapEnable.restype = None
+cg.CGEventTapEnable.argtypes = [ctypes.c_void_p, ctypes.c_bool]
+cf.CFRelease.restype = None
+cf.CFRelease.argtypes = [ctypes.c_void_p]
+cf.CFMachPortCreateRunLoopSource.restype = ctypes.c_void_p
+cf.CFMachPortCreateRunLoopSource.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_long]
+cf.CFRunLoopGetCurrent.restype = ctypes.c_void_p
+cf.CFRunLoopGetCurrent.argtypes = []
+cf.CFRunLoopAddSource.restype = None
+cf.CFRunLoopAddSource.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p]
+cf.CFRunLoopRunInMode.restype = ctypes.c_int32
+cf.CFRunLoopRunInMode.argtypes = [ctypes.c_void_p, ctypes.c_double, ctypes.c_bool]
+kCFRunLoopDefaultMode = ctypes.c_void_p.in_dll(cf, 'kCFRunLoopDefaultMode')
 
-print("Move your mouse — Ctrl-C to stop\n")
-try:
+last = None
+tap = None
+
+def show(pos):
+    global last
+    xy = (int(pos.x), int(pos.y))
+    if xy == last:
+        return
+    last = xy
+    sys.stdout.write(f'\r  ({xy[0]:5d}, {xy[1]:5d})   ')
+    sys.stdout.flush()
+
+@CGEventTapCallBack
+def on_event(proxy, etype, event, refcon):
+    if etype == kCGEventTapDisabledByTimeout:
+        cg.CGEventTapEnable(tap, True)
+    else:
+        show(cg.CGEventGetLocation(event))
+    return event
+
+def run_tap():
+    """Event-driven: prints only when the OS delivers a mouse-move. Returns False if unavailable."""
+    global tap
+    tap = cg.CGEventTapCreate(kCGSessionEventTap, kCGHeadInsertEventTap,
+                              kCGEventTapOptionListenOnly, EVENT_MASK, on_event, None)
+    if not tap:
+        return False
+    source = cf.CFMachPortCreateRunLoopSource(None, tap, 0)
+    cf.CFRunLoopAddSource(cf.CFRunLoopGetCurrent(), source, kCFRunLoopDefaultMode)
+    cg.CGEventTapEnable(tap, True)
+    # Run the loop in short slices so Ctrl-C is still noticed between them
+    while True:
+        cf.CFRunLoopRunInMode(kCFRunLoopDefaultMode, 0.25, False)
+
+def run_poll():
     while True:
         ev  = cg.CGEventCreate(None)
         pos = cg.CGEventGetLocation(ev)
-        sys.stdout.write(f'\r  ({int(pos.x):5d}, {int(pos.y):5d})   ')
-        sys.stdout.flush()
+        cf.CFRelease(ev)
+        show(pos)
         time.sleep(0.04)
+
+print("Move your mouse — Ctrl-C to stop\n")
+try:
+    ev = cg.CGEventCreate(None)
+    show(cg.CGEventGetLocation(ev))
+    cf.CFRelease(ev)
+    if not run_tap():
+        print("\n(no Input Monitoring permission — polling instead)\n")
+        run_poll()
 except KeyboardInterrupt:
     print()
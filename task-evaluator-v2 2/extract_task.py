@@ -10,20 +10,206 @@ Usage:
 """
 
 import sys
-import json
 import re
 import glob
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from bs4 import BeautifulSoup, Comment
+import orjson
+from lxml import etree
 
+_QUESTION_ID_RE = re.compile(r'^question-\d+')
+# Plain literals matched against lower-cased text — cheaper than regex alternation.
+_DL_HREF_LITERALS = ('download', 'export', 'attachment', '.zip', '.tar', '.pdf', '.csv', '.json')
+_DL_TEXT_LITERALS = ('download', 'export', 'save', 'get file')
+_DL_ACTION_LITERALS = ('download', 'export')
+# Exact class tokens that open a section; intersected with each element's
+# classes in one C-level pass.
+_SECTION_CLASSES = frozenset({'rendered-markdown', 'gondor-wysiwyg'})
+# Substring match, so Tailwind variants/modifiers like hover:tw-bg-primary
+# or tw-bg-primary/50 still count — exact-token sets would miss them.
+_HIGHLIGHT_CLASS_PARTS = ('tw-text-blue-600', 'tw-bg-blue-600', 'tw-bg-primary')
+# What lxml.html's HtmlElement.text_content() runs; iterparse yields plain
+# etree elements, so call the compiled XPath directly.
+_text_content = etree.XPath('string()')
+# Cells of one row; compiled once rather than per row by row.xpath()
+_row_cells = etree.XPath('.//th | .//td')
+# Raw-text containers whose contents BS4's get_text() never counted as text.
+# itertext()/string() would, so the walk empties them at their end tag.
+_NON_TEXT_TAGS = frozenset({'script', 'style', 'template'})
 
-def extract_from_html(filepath: str) -> dict:
-    """Extract all task data generically from any annotation HTML file."""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        html = f.read()
 
-    soup = BeautifulSoup(html, 'lxml')
+def _block_text(el) -> str:
+    """Stripped text fragments of a block, one per line (itertext runs in C)."""
+    return '\n'.join(s for s in (t.strip() for t in el.itertext()) if s)
+
+
+def _build_option(inp, label_text: str) -> dict:
+    """Option dict shared by radios, checkboxes and orphan radios."""
+    attrib = inp.attrib
+    return {'value': attrib.get('value', ''), 'label': label_text, 'checked': 'checked' in attrib}
+
+
+def _label_text(label_el) -> str:
+    return _text_content(label_el).strip() if label_el is not None else ''
+
+
+def _new_question_inputs() -> dict:
+    """What the walk records inside an open question div."""
+    # radio/checkbox hold (input, enclosing <label> or None) pairs;
+    # label_for maps a <label for="X"> to its element, first one wins
+    return {'radio': [], 'checkbox': [], 'textarea': None, 'select': None, 'text_el': None,
+            'label_for': {}}
+
+
+def _extract_question(qdiv, found: dict):
+    """Build the question dict for a closed question div, or None for a ghost div.
+
+    ``found`` is what the walk recorded inside the div, so nothing here
+    re-queries the subtree.
+    """
+    q_id = qdiv.get('data-question-id', '')
+    q_label = qdiv.get('data-label', '')
+    q_num = qdiv.get('id', '').replace('question-', '')
+
+    # Skip ghost divs: no data-question-id means no real inputs
+    if not q_id:
+        has_inputs = (found['radio'] or found['checkbox'] or
+                      found['textarea'] is not None or found['select'] is not None)
+        if not has_inputs:
+            return None
+
+    # Get the question text from gondor-wysiwyg inside it
+    q_text_el = found['text_el']
+    q_text = _block_text(q_text_el) if q_text_el is not None else ''
+
+    # Build a CSS selector that uniquely targets this question div.
+    # Prefer data-question-id UUID (globally unique), fall back to #id.
+    if q_id:
+        css_selector = f'div[data-question-id="{q_id}"]'
+    else:
+        css_selector = f'#question-{q_num}'
 
+    question = {
+        'number': q_num,
+        'id': q_id,
+        'label': q_label,
+        'selector': css_selector,
+        'text': q_text[:2000],
+        'type': 'unknown',
+        'options': [],
+        'selected': None,
+    }
+    # Check for radio buttons in this question
+    # A <label for> pointing at the input beats the enclosing label, and
+    # also covers labels that sit beside the input rather than around it
+    label_for = found['label_for']
+    radios = found['radio']
+    if radios:
+        question['type'] = 'radio'
+        opts_list = question['options']
+        for radio, label_el in radios:
+            label_el = label_for.get(radio.get('id'), label_el)
+            opt = _build_option(radio, _label_text(label_el))
+            opts_list.append(opt)
+            if opt['checked']:
+                question['selected'] = opt['label']
+
+    # Check for checkboxes
+    checkboxes = found['checkbox']
+    if checkboxes and not radios:
+        question['type'] = 'checkbox'
+        opts_list = question['options']
+        for cb, label_el in checkboxes:
+            label_el = label_for.get(cb.get('id'), label_el)
+            opt = _build_option(cb, _label_text(label_el))
+            opts_list.append(opt)
+            if opt['checked']:
+                if question['selected'] is None:
+                    question['selected'] = []
+                question['selected'].append(opt['label'])
+
+    # Check for textareas
+    ta = found['textarea']
+    if ta is not None:
+        question['type'] = 'textarea'
+        question['value'] = _text_content(ta).strip()
+
+    # Check for select dropdowns
+    sel = found['select']
+    if sel is not None:
+        question['type'] = 'select'
+        for opt_el in sel.iter('option'):
+            opt = {
+                'value': opt_el.get('value', ''),
+                'label': _text_content(opt_el).strip(),
+                'selected': opt_el.get('selected') is not None,
+            }
+            question['options'].append(opt)
+            if opt['selected']:
+                question['selected'] = opt['label']
+
+    return question
+
+
+def _extract_link(a):
+    """Download-link dict for an <a href>, or None if it doesn't look like one."""
+    href = a.get('href')
+    text = _text_content(a).strip()
+    has_download_attr = a.get('download') is not None
+    href_l = href.lower()
+    is_download_url = any(s in href_l for s in _DL_HREF_LITERALS)
+    # Also catch buttons styled as links with download-like text
+    text_l = text.lower()
+    is_download_text = any(s in text_l for s in _DL_TEXT_LITERALS)
+
+    if has_download_attr or is_download_url or is_download_text:
+        return {
+            'text': text[:200],
+            'href': href[:500],
+            'has_download_attr': has_download_attr,
+        }
+    return None
+
+
+def _extract_button(btn):
+    """Download-link dict for a <button> whose text/onclick mentions a download."""
+    text = _text_content(btn).strip()
+    onclick = btn.get('onclick', '')
+    text_l, onclick_l = text.lower(), onclick.lower()
+    if any(s in text_l or s in onclick_l for s in _DL_ACTION_LITERALS):
+        return {
+            'text': text[:200],
+            'href': onclick[:500] if onclick else '',
+            'has_download_attr': False,
+        }
+    return None
+
+
+def _extract_table(table):
+    """Headers + rows for a <table>, or None if it has no data rows."""
+    table_data = []
+    headers = []
+    for i, row in enumerate(table.iter('tr')):
+        cell_texts = [_text_content(c).strip() for c in _row_cells(row)]
+        if i == 0:
+            headers = cell_texts
+        else:
+            if headers and len(headers) == len(cell_texts):
+                table_data.append(dict(zip(headers, cell_texts)))
+            else:
+                table_data.append(cell_texts)
+    if table_data:
+        return {'headers': headers, 'rows': table_data}
+    return None
+
+
+def extract_from_html(filepath: str) -> dict:
+    """Extract all task data generically from any annotation HTML file.
+
+    The file is stream-parsed: every extractable element is handled at its
+    end tag, and subtrees that no still-open element needs are freed, so
+    memory stays bounded by the largest section rather than the file size.
+    """
     result = {
         'file': str(filepath),
         'title': '',
@@ -33,213 +219,183 @@ def extract_from_html(filepath: str) -> dict:
         'instructions': [],
     }
 
-    # --- Page title ---
-    title_tag = soup.find('title')
-    if title_tag:
-        result['title'] = title_tag.get_text(strip=True)
-    # ── 1. CONVERSATION / RESPONSE CONTENT ──────────────────────────────
-    # Grab all rendered-markdown sections (the actual prompt + responses)
-    markdown_sections = soup.find_all(class_='rendered-markdown')
-    for i, section in enumerate(markdown_sections):
-        text = section.get_text(separator='\n', strip=True)
-        if text and len(text) > 10:
-            result['conversation_parts'].append({
-                'index': i,
-                'text': text[:8000],  # generous limit
-            })
-
-    # ── 2. QUESTIONS — generic extraction via data-label / data-question-id
-    # Each question block: div[id^="question-"][data-question-id]
-    # IMPORTANT: Skip "ghost" divs that share the same id but have no
-    # data-question-id and no actual inputs (radio/checkbox/textarea).
-    question_divs = soup.find_all('div', id=re.compile(r'^question-\d+'))
-    for qdiv in question_divs:
-        q_id = qdiv.get('data-question-id', '')
-        q_label = qdiv.get('data-label', '')
-        q_num = qdiv.get('id', '').replace('question-', '')
-
-        # Skip ghost divs: no data-question-id means no real inputs
-        if not q_id:
-            has_inputs = (qdiv.find('input', attrs={'type': 'radio'}) or
-                          qdiv.find('input', attrs={'type': 'checkbox'}) or
-                          qdiv.find('textarea') or
-                          qdiv.find('select'))
-            if not has_inputs:
-                continue
-
-        # Get the question text from gondor-wysiwyg inside it
-        q_text_el = qdiv.find(attrs={'data-testid': 'question-text'})
-        q_text = q_text_el.get_text(separator='\n', strip=True) if q_text_el else ''
-
-        # Build a CSS selector that uniquely targets this question div.
-        # Prefer data-question-id UUID (globally unique), fall back to #id.
-        if q_id:
-            css_selector = f'div[data-question-id="{q_id}"]'
-        else:
-            css_selector = f'#question-{q_num}'
-
-        question = {
-            'number': q_num,
-            'id': q_id,
-            'label': q_label,
-            'selector': css_selector,
-            'text': q_text[:2000],
-            'type': 'unknown',
-            'options': [],
-            'selected': None,
-        }
-        # Check for radio buttons in this question
-        radios = qdiv.find_all('input', attrs={'type': 'radio'})
-        if radios:
-            question['type'] = 'radio'
-            for radio in radios:
-                label_el = radio.find_parent('label')
-                label_text = label_el.get_text(strip=True) if label_el else ''
-                is_checked = radio.has_attr('checked')
-                opt = {
-                    'value': radio.get('value', ''),
-                    'label': label_text,
-                    'checked': is_checked,
-                }
-                question['options'].append(opt)
-                if is_checked:
-                    question['selected'] = label_text
-
-        # Check for checkboxes
-        checkboxes = qdiv.find_all('input', attrs={'type': 'checkbox'})
-        if checkboxes and not radios:
-            question['type'] = 'checkbox'
-            for cb in checkboxes:
-                label_el = cb.find_parent('label')
-                label_text = label_el.get_text(strip=True) if label_el else ''
-                is_checked = cb.has_attr('checked')
-                opt = {
-                    'value': cb.get('value', ''),
-                    'label': label_text,
-                    'checked': is_checked,
-                }
-                question['options'].append(opt)
-                if is_checked:
-                    if question['selected'] is None:
-                        question['selected'] = []
-                    question['selected'].append(label_text)
-
-        # Check for textareas
-        ta = qdiv.find('textarea')
-        if ta:
-            question['type'] = 'textarea'
-            question['value'] = ta.get_text(strip=True)
-
-        # Check for select dropdowns
-        sel = qdiv.find('select')
-        if sel:
-            question['type'] = 'select'
-            for opt_el in sel.find_all('option'):
-                opt = {
-                    'value': opt_el.get('value', ''),
-                    'label': opt_el.get_text(strip=True),
-                    'selected': opt_el.has_attr('selected'),
-                }
-                question['options'].append(opt)
-                if opt_el.has_attr('selected'):
-                    question['selected'] = opt_el.get_text(strip=True)
-
-        result['questions'].append(question)
-    # ── 3. FALLBACK: catch any radio/checkbox/textarea NOT inside question divs
-    # (some layouts don't use question-N divs)
-    found_q_ids = {q['id'] for q in result['questions']}
-    orphan_radios = {}
-    for radio in soup.find_all('input', attrs={'type': 'radio'}):
-        # Skip if already captured in a question div
-        parent_q = radio.find_parent('div', id=re.compile(r'^question-\d+'))
-        if parent_q:
+    # Each section reserves a slot at the start tag and fills it at the end
+    # tag, so output stays in document order even for nested elements.
+    conversation_slots, question_slots, instruction_slots = [], [], []
+    link_slots, button_slots, table_slots, highlight_slots = [], [], [], []
+    orphan_radios, orphan_textareas = {}, []
+    markdown_count = 0
+    title_seen = False
+    # Elements handled at their end tag, with the (job, slot) pairs to run.
+    # While any is open, nothing below it may be freed.
+    captures = []
+    # Open question divs (innermost last), each with the inputs recorded
+    # inside it, and open <label>s — so inputs know their ancestors without
+    # an upward search and questions are built without rescanning.
+    q_stack = []
+    label_stack = []
+
+    # Hand libxml2 the path itself: it reads raw bytes through its own
+    # buffered reader, with no Python-side read() or str decode of the file.
+    context = etree.iterparse(filepath, events=('start', 'end'), tag=etree.Element,
+                              html=True, huge_tree=True, encoding='utf-8')
+    for event, el in context:
+        if event == 'start':
+            jobs = []
+            if q_stack and el.get('data-testid') == 'question-text':
+                for found in q_stack:
+                    if found['text_el'] is None:
+                        found['text_el'] = el
+            tag = el.tag
+            if tag == 'input':
+                itype = el.get('type')
+                if q_stack:
+                    if itype == 'radio' or itype == 'checkbox':
+                        entry = (el, label_stack[-1][0] if label_stack else None)
+                        for found in q_stack:
+                            found[itype].append(entry)
+                elif itype == 'radio':
+                    # ── 3. FALLBACK: radios NOT inside question divs
+                    # (some layouts don't use question-N divs)
+                    name = el.get('name', 'unnamed')
+                    if name not in orphan_radios:
+                        orphan_radios[name] = {'type': 'radio', 'label': name, 'options': [], 'selected': None}
+                    group = orphan_radios[name]
+                    opt = _build_option(el, '')
+                    group['options'].append(opt)
+                    # The label text is only complete once the <label> closes
+                    if label_stack:
+                        label_stack[-1][1].append((group, opt))
+                    elif opt['checked']:
+                        group['selected'] = ''
+            elif tag == 'label':
+                label_stack.append((el, []))
+                for_id = el.get('for')
+                if for_id:
+                    for found in q_stack:
+                        found['label_for'].setdefault(for_id, el)
+                jobs.append(('label', None))
+            elif tag == 'textarea' or tag == 'select':
+                if q_stack:
+                    for found in q_stack:
+                        if found[tag] is None:
+                            found[tag] = el
+                elif tag == 'textarea':
+                    # Orphan textarea, handled once its text is parsed
+                    jobs.append(('textarea', None))
+            elif tag == 'a':
+                if el.get('href') is not None:
+                    link_slots.append(None)
+                    jobs.append(('link', len(link_slots) - 1))
+            elif tag == 'button':
+                button_slots.append(None)
+                jobs.append(('button', len(button_slots) - 1))
+            elif tag == 'table':
+                table_slots.append(None)
+                jobs.append(('table', len(table_slots) - 1))
+            elif tag == 'div':
+                if _QUESTION_ID_RE.match(el.get('id', '')):
+                    question_slots.append(None)
+                    jobs.append(('question', len(question_slots) - 1))
+                    q_stack.append(_new_question_inputs())
+            elif tag == 'title' and not title_seen:
+                title_seen = True
+                jobs.append(('title', None))
+            cls = el.get('class')
+            if cls:
+                classes = _SECTION_CLASSES.intersection(cls.split())
+                if 'rendered-markdown' in classes:
+                    conversation_slots.append(None)
+                    jobs.append(('markdown', markdown_count))
+                    markdown_count += 1
+                if 'gondor-wysiwyg' in classes:
+                    instruction_slots.append(None)
+                    jobs.append(('wysiwyg', len(instruction_slots) - 1))
+                if any(part in cls for part in _HIGHLIGHT_CLASS_PARTS):
+                    highlight_slots.append(None)
+                    jobs.append(('highlight', len(highlight_slots) - 1))
+            if jobs:
+                captures.append((el, jobs))
             continue
-        name = radio.get('name', 'unnamed')
-        if name not in orphan_radios:
-            orphan_radios[name] = {'type': 'radio', 'label': name, 'options': [], 'selected': None}
-        label_el = radio.find_parent('label')
-        label_text = label_el.get_text(strip=True) if label_el else ''
-        is_checked = radio.has_attr('checked')
-        orphan_radios[name]['options'].append({'value': radio.get('value',''), 'label': label_text, 'checked': is_checked})
-        if is_checked:
-            orphan_radios[name]['selected'] = label_text
+
+        if el.tag in _NON_TEXT_TAGS:
+            # Drop the code/CSS/template body before any enclosing section
+            # reads its text; the tail is page text and stays
+            el.clear(keep_tail=True)
+        if captures and captures[-1][0] is el:
+            for job, slot in captures.pop()[1]:
+                if job == 'markdown':
+                    # ── 1. CONVERSATION / RESPONSE CONTENT (rendered-markdown)
+                    # Cheap C-level length gate before assembling the block text
+                    if len(_text_content(el)) > 10:
+                        text = _block_text(el)
+                        if text and len(text) > 10:
+                            conversation_slots[slot] = {
+                                'index': slot,
+                                'text': text[:8000],  # generous limit
+                            }
+                elif job == 'question':
+                    # ── 2. QUESTIONS — generic extraction via data-label / data-question-id
+                    question_slots[slot] = _extract_question(el, q_stack.pop())
+                elif job == 'label':
+                    _, pending = label_stack.pop()
+                    if pending:
+                        label_text = _text_content(el).strip()
+                        for group, opt in pending:
+                            opt['label'] = label_text
+                            if opt['checked']:
+                                group['selected'] = label_text
+                elif job == 'textarea':
+                    # Orphan textareas (question-div ones are handled with their question)
+                    text = _text_content(el).strip()
+                    if text:
+                        orphan_textareas.append({
+                            'number': 'orphan-ta', 'id': el.get('name', ''), 'label': el.get('placeholder', 'textarea'),
+                            'text': '', 'type': 'textarea', 'value': text, 'options': [], 'selected': None,
+                        })
+                elif job == 'link':
+                    # ── 4. DOWNLOAD LINKS
+                    link_slots[slot] = _extract_link(el)
+                elif job == 'button':
+                    # Also check buttons with onclick that might trigger downloads
+                    button_slots[slot] = _extract_button(el)
+                elif job == 'wysiwyg':
+                    # ── 5. INSTRUCTIONS / RUBRIC CONTENT (gondor-wysiwyg)
+                    if len(_text_content(el)) > 20:
+                        text = _block_text(el)
+                        if text and len(text) > 20:
+                            instruction_slots[slot] = text[:10000]
+                elif job == 'table':
+                    # ── 6. TABLES (rating summaries, rubrics, etc)
+                    table_slots[slot] = _extract_table(el)
+                elif job == 'highlight':
+                    # ── 7. HIGHLIGHTED / SELECTED indicators
+                    highlight_slots[slot] = _text_content(el).strip()
+                elif job == 'title':
+                    result['title'] = _text_content(el).strip()
+
+        if not captures:
+            # Nothing still open needs this subtree — free it and any
+            # already-processed siblings before it.
+            el.clear()
+            parent = el.getparent()
+            if parent is not None:
+                while el.getprevious() is not None:
+                    del parent[0]
+    del context
+
+    result['conversation_parts'] = [c for c in conversation_slots if c]
+    result['questions'] = [q for q in question_slots if q]
     for name, q in orphan_radios.items():
         result['questions'].append({'number': f'orphan-{name[:8]}', 'id': name, 'label': name, 'text': '', **q})
-
-    # Orphan textareas
-    for ta in soup.find_all('textarea'):
-        parent_q = ta.find_parent('div', id=re.compile(r'^question-\d+'))
-        if parent_q:
-            continue
-        text = ta.get_text(strip=True)
-        if text:
-            result['questions'].append({
-                'number': 'orphan-ta', 'id': ta.get('name', ''), 'label': ta.get('placeholder', 'textarea'),
-                'text': '', 'type': 'textarea', 'value': text, 'options': [], 'selected': None,
-            })
-    # ── 4. DOWNLOAD LINKS ───────────────────────────────────────────────
-    # Any <a> with href containing download/export/attachment/file patterns
-    # Also any <a> with explicit download attribute
-    for a in soup.find_all('a', href=True):
-        href = a['href']
-        text = a.get_text(strip=True)
-        has_download_attr = a.has_attr('download')
-        is_download_url = bool(re.search(r'download|export|attachment|\.zip|\.tar|\.pdf|\.csv|\.json', href, re.I))
-        # Also catch buttons styled as links with download-like text
-        is_download_text = bool(re.search(r'download|export|save|get file', text, re.I))
-
-        if has_download_attr or is_download_url or is_download_text:
-            result['download_links'].append({
-                'text': text[:200],
-                'href': href[:500],
-                'has_download_attr': has_download_attr,
-            })
-
-    # Also check buttons with onclick that might trigger downloads
-    for btn in soup.find_all('button'):
-        text = btn.get_text(strip=True)
-        onclick = btn.get('onclick', '')
-        if re.search(r'download|export', text, re.I) or re.search(r'download|export', onclick, re.I):
-            result['download_links'].append({
-                'text': text[:200],
-                'href': onclick[:500] if onclick else '',
-                'has_download_attr': False,
-            })
-
-    # ── 5. INSTRUCTIONS / RUBRIC CONTENT ────────────────────────────────
-    # Grab all gondor-wysiwyg sections (instruction blocks)
-    wysiwyg_sections = soup.find_all(class_='gondor-wysiwyg')
-    for section in wysiwyg_sections:
-        text = section.get_text(separator='\n', strip=True)
-        if text and len(text) > 20:
-            result['instructions'].append(text[:10000])
-
-    # ── 6. TABLES (rating summaries, rubrics, etc) ──────────────────────
-    tables = soup.find_all('table')
-    extracted_tables = []
-    for table in tables:
-        rows = table.find_all('tr')
-        table_data = []
-        headers = []
-        for i, row in enumerate(rows):
-            cells = row.find_all(['th', 'td'])
-            cell_texts = [c.get_text(strip=True) for c in cells]
-            if i == 0:
-                headers = cell_texts
-            else:
-                if headers and len(headers) == len(cell_texts):
-                    table_data.append(dict(zip(headers, cell_texts)))
-                else:
-                    table_data.append(cell_texts)
-        if table_data:
-            extracted_tables.append({'headers': headers, 'rows': table_data})
+    result['questions'].extend(orphan_textareas)
+    result['download_links'] = [d for d in link_slots + button_slots if d]
+    result['instructions'] = [t for t in instruction_slots if t]
+    extracted_tables = [t for t in table_slots if t]
     if extracted_tables:
         result['tables'] = extracted_tables
-    # ── 7. HIGHLIGHTED / SELECTED indicators ────────────────────────────
-    selected_els = soup.find_all(class_=re.compile(r'tw-text-blue-600|tw-bg-blue-600|tw-bg-primary'))
     highlights = []
-    for el in selected_els:
-        text = el.get_text(strip=True)
+    for text in highlight_slots:
         if text and len(text) < 200 and text not in highlights:
             highlights.append(text)
     if highlights:
@@ -251,6 +407,14 @@ def extract_from_html(filepath: str) -> dict:
     return result
 
 
+def _extract_safe(filepath: str):
+    """Pool worker: (result, None) on success, (None, message) on failure."""
+    try:
+        return extract_from_html(filepath), None
+    except Exception as e:
+        return None, str(e)
+
+
 def main():
     if len(sys.argv) < 2:
         print(__doc__)
@@ -268,27 +432,38 @@ def main():
             files.extend(expanded if expanded else [sys.argv[i]])
             i += 1
 
-    results = []
+    existing = []
     for filepath in files:
         if not Path(filepath).exists():
             print(f"⚠️  Not found: {filepath}", file=sys.stderr)
             continue
+        existing.append(filepath)
+
+    # Parsing is CPU-bound, so spread multiple files across processes;
+    # a single file isn't worth the pool start-up.
+    if len(existing) > 1:
+        with ProcessPoolExecutor() as pool:
+            outcomes = list(pool.map(_extract_safe, existing, chunksize=1))
+    else:
+        outcomes = [_extract_safe(f) for f in existing]
+
+    results = []
+    for filepath, (result, error) in zip(existing, outcomes):
         print(f"📄 Processing: {filepath}", file=sys.stderr)
-        try:
-            result = extract_from_html(filepath)
-            results.append(result)
-            nq = len(result.get('questions', []))
-            nc = len(result.get('conversation_parts', []))
-            nd = len(result.get('download_links', []))
-            sel = sum(1 for q in result.get('questions', []) if q.get('selected'))
-            print(f"   {nc} content sections, {nq} questions ({sel} answered), {nd} downloads", file=sys.stderr)
-        except Exception as e:
-            print(f"❌ Error: {e}", file=sys.stderr)
+        if error is not None:
+            print(f"❌ Error: {error}", file=sys.stderr)
+            continue
+        results.append(result)
+        nq = len(result.get('questions', []))
+        nc = len(result.get('conversation_parts', []))
+        nd = len(result.get('download_links', []))
+        sel = sum(1 for q in result.get('questions', []) if q.get('selected'))
+        print(f"   {nc} content sections, {nq} questions ({sel} answered), {nd} downloads", file=sys.stderr)
 
     output = results[0] if len(results) == 1 else results
     out_path = output_file or 'current.json'
-    with open(out_path, 'w', encoding='utf-8') as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
+    with open(out_path, 'wb') as f:
+        f.write(orjson.dumps(output, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
     print(f"✅ Saved to {out_path}", file=sys.stderr)
 
 
@@ -12,18 +12,20 @@ Usage:
   python task_app.py --no-eval    # Watch only, don't auto-evaluate
 """
 
-import json
+import functools
+import hashlib
 import re
 import sys
 import time
 import threading
 import webbrowser
-import logging
 import urllib.request as urllib_req
 from datetime import datetime
 from pathlib import Path
 
-from flask import Flask, jsonify, render_template_string, request
+import orjson
+from flask import Flask, Response, jsonify, render_template_string, request
+from waitress import serve
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 # Adjust imports for local modules
@@ -35,17 +37,86 @@ from extract_task import extract_from_html
 
 PORT = 5111
 DOWNLOADS_DIR = Path.home() / "Downloads"
+# waitress settings. The request lookahead lets waitress notice a client that
+# hung up mid-response, which is what frees an /api/stream thread.
+SERVE_OPTS = {"threads": 8, "channel_request_lookahead": 1}
+# Each open /api/stream holds a worker thread, so only half of them may be
+# streams; past that the UI gets a 503 and polls instead
+MAX_STREAMS = SERVE_OPTS["threads"] // 2
 
 # ── State ────────────────────────────────────────────────────────────────
-task_history = []
+# id → task, ids handed out by _add_history and never reused or renumbered
+# within a process (so dict order is id order); they restart at 0 with the
+# server, which is what _history_boot tells clients
+task_history = {}
+_next_task_id = 0
 current_status = {"state": "idle", "message": "Waiting for tasks..."}
 history_lock = threading.Lock()
+# Immutable copy of task_history for the polled read-only routes. Writers
+# rebuild it under history_lock; readers just grab the reference (atomic
+# under the GIL), so a poll never waits behind a writer. The newest-first
+# copy is what /api/tasks serves, so it is built once per write, not per poll;
+# it is published together with its ETag so the two always match.
+# ETags are "<boot>-<n>": n counts publishes, boot keeps a restarted
+# server from matching a tag handed out by the previous process.
+_history_boot = f"{time.time_ns():x}"
+_history_version = 0
+_history_snapshot = ()
+_history_newest_first = (f'"{_history_boot}-0"', ())   # (etag, tasks newest first)
+_history_by_id = {}
 latest_task_data = None   # raw extracted task (questions + options)
 latest_eval = None        # raw evaluation dict from Claude
+# Bumped on every status or history change; /api/stream waits on it
+_state_version = 0
+_state_changed = threading.Condition(history_lock)
+_open_streams = 0          # /api/stream responses currently holding a thread
+
+def _notify_state() -> None:
+    """Wake /api/stream listeners. Call with history_lock held."""
+    global _state_version
+    _state_version += 1
+    _state_changed.notify_all()
+
+def _set_status(state: str, message: str) -> None:
+    """Update current_status and notify listeners. Call with history_lock held."""
+    current_status["state"] = state
+    current_status["message"] = message
+    _notify_state()
+
+def _publish_history() -> None:
+    """Rebuild the reader snapshot. Call with history_lock held, after mutating task_history."""
+    global _history_snapshot, _history_newest_first, _history_by_id, _history_version
+    _history_version += 1
+    _history_snapshot = tuple(task_history.values())
+    _history_newest_first = (f'"{_history_boot}-{_history_version}"', _history_snapshot[::-1])
+    _history_by_id = dict(task_history)
+    _notify_state()
+
+def _add_history(result: dict) -> None:
+    """Give result the next id and publish it. Call with history_lock held."""
+    global _next_task_id
+    result.setdefault("_meta", {})["id"] = _next_task_id
+    task_history[_next_task_id] = result
+    _next_task_id += 1
+    _publish_history()
+
+# ── JSON helpers ─────────────────────────────────────────────────────────
+def _save_json(path, obj) -> None:
+    """Write obj as indented UTF-8 JSON with orjson in a single write."""
+    with open(path, "wb") as f:
+        f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+
+def _json_response(obj, status: int = 200) -> Response:
+    """orjson-encoded replacement for jsonify on the polled endpoints (keys sorted like jsonify)."""
+    body = orjson.dumps(obj, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    return Response(body, status=status, mimetype="application/json")
 
 # ── Automation helpers ───────────────────────────────────────────────────
+_KEY_STRIP_RE = re.compile(r'[^a-zA-Z0-9_\- ]')
+
+@functools.lru_cache(maxsize=1024)
 def _sanitize_key(label: str) -> str:
-    return re.sub(r'[^a-zA-Z0-9_\- ]', '', label).strip().lower().replace(' ', '_').replace('-', '_')
+    return _KEY_STRIP_RE.sub('', label).strip().lower().replace(' ', '_').replace('-', '_')
 
 def build_automation_commands(task_data: dict, evaluation: dict) -> list:
     """Map Claude's evaluation answers → FILL_FIELD / CLICK_SELECTOR commands.
@@ -55,6 +126,14 @@ def build_automation_commands(task_data: dict, evaluation: dict) -> list:
     """
     commands = []
     for q in task_data.get('questions', []):
+        # Every question div gets its selector at extraction time; only the
+        # orphan inputs lack one, and they can't be targeted, so skip them
+        # (and unknown types) before any key or option work.
+        sel    = q.get('selector')
+        q_type = q.get('type', 'unknown')
+        if sel is None or q_type == 'unknown':
+            continue
+
         label = q.get('label') or (q.get('text') or '')[:80] or f"question_{q.get('number','?')}"
         key = _sanitize_key(label)
         if key not in evaluation:
@@ -63,18 +142,17 @@ def build_automation_commands(task_data: dict, evaluation: dict) -> list:
         if answer is None or (isinstance(answer, str) and not answer.strip()):
             continue
 
-        q_type = q.get('type', 'unknown')
         opts   = q.get('options', [])
-        # Use the pre-built selector from extract_task (UUID-based, globally unique)
-        sel    = q.get('selector', '')
 
-        if q_type == 'unknown' or not sel:
-            continue
+        # Normalized label/value → option, first occurrence wins (as the old linear scan did)
+        label_lookup, value_lookup = {}, {}
+        for o in opts:
+            label_lookup.setdefault((o.get('label', '') or '').strip().lower(), o)
+            value_lookup.setdefault((o.get('value', '') or '').strip().lower(), o)
 
         if q_type == 'radio':
-            match = next((o for o in opts if o.get('label','').strip().lower() == str(answer).strip().lower()), None)
-            if match is None:
-                match = next((o for o in opts if o.get('value','').strip().lower() == str(answer).strip().lower()), None)
+            ans_norm = str(answer).strip().lower()
+            match = label_lookup.get(ans_norm) or value_lookup.get(ans_norm)
             if match:
                 label_text = (match.get('label') or match.get('value') or '').strip()
                 if label_text:
@@ -88,7 +166,7 @@ def build_automation_commands(task_data: dict, evaluation: dict) -> list:
         elif q_type == 'checkbox':
             answers = answer if isinstance(answer, list) else [answer]
             for ans in answers:
-                match = next((o for o in opts if o.get('label','').strip().lower() == str(ans).strip().lower()), None)
+                match = label_lookup.get(str(ans).strip().lower())
                 if match:
                     label_text = (match.get('label') or match.get('value') or '').strip()
                     if label_text:
@@ -105,7 +183,7 @@ def trigger_automation(task_data: dict, evaluation: dict):
     print(f"🤖 Sending {len(commands)} fill commands to automation server...")
     for c in commands:
         print(f"   {c}")
-    payload = json.dumps({'commands': commands, 'cursorX': 0, 'cursorY': 0}).encode()
+    payload = orjson.dumps({'commands': commands, 'cursorX': 0, 'cursorY': 0})
     try:
         req = urllib_req.Request(
             'http://localhost:3004/automation',
@@ -145,45 +223,36 @@ class TaskFileHandler(FileSystemEventHandler):
         global latest_task_data, latest_eval
         try:
             with history_lock:
-                current_status["state"] = "extracting"
-                current_status["message"] = f"Extracting: {filepath.name}"
+                _set_status("extracting", f"Extracting: {filepath.name}")
             print(f"\n{'='*60}")
             print(f"[+] Detected: {filepath.name}")
             print("📄 Extracting task data...")
             task_data = extract_from_html(str(filepath))
-            with open(CURRENT_JSON, "w", encoding="utf-8") as f:
-                json.dump(task_data, f, indent=2, ensure_ascii=False)
+            _save_json(CURRENT_JSON, task_data)
             print(f"✅ Extracted to current.json")
             if not self.auto_evaluate:
                 with history_lock:
-                    current_status["state"] = "idle"
-                    current_status["message"] = "Extracted — run manually to evaluate"
+                    _set_status("idle", "Extracted — run manually to evaluate")
                 return
             with history_lock:
-                current_status["state"] = "evaluating"
-                current_status["message"] = f"Claude {STYX_MODEL} is thinking..."
+                _set_status("evaluating", f"Claude {STYX_MODEL} is thinking...")
             print(f"🤖 Evaluating with {STYX_MODEL}...")
             result = evaluate(task_data=task_data)
             if "error" in result:
                 print(f"❌ Evaluation error: {result['error']}")
                 with history_lock:
-                    current_status["state"] = "error"
-                    current_status["message"] = result["error"]
+                    _set_status("error", result["error"])
                 return
-            result_file = SCRIPT_DIR / "result.json"
-            with open(result_file, "w", encoding="utf-8") as f:
-                json.dump(result, f, indent=2, ensure_ascii=False)
+            _save_json(SCRIPT_DIR / "result.json", result)
             result["_meta"] = {
                 "filename": filepath.name,
                 "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "id": len(task_history),
             }
             with history_lock:
                 latest_task_data = task_data
                 latest_eval = result.get("evaluation", {})
-                task_history.append(result)
-                current_status["state"] = "complete"
-                current_status["message"] = "Evaluation complete — ready to fill"
+                _add_history(result)
+                _set_status("complete", "Evaluation complete — ready to fill")
             usage = result.get("usage", {})
             print(f"✅ Done! {usage.get('input_tokens', 0):,} in / {usage.get('output_tokens', 0):,} out")
             # Auto-fill the live form
@@ -192,70 +261,137 @@ class TaskFileHandler(FileSystemEventHandler):
             print(f"❌ Error: {e}")
             import traceback; traceback.print_exc()
             with history_lock:
-                current_status["state"] = "error"
-                current_status["message"] = str(e)
+                _set_status("error", str(e))
         finally:
             self.processing = False
 
 # ── Flask Routes ────────────────────────────────────────────────────────
 @app.route("/")
-def index(): return render_template_string(HTML_TEMPLATE)
+def index(): return render_template_string(HTML_TEMPLATE, css_version=_CSS_VERSION)
+
+@app.route("/static/app.css")
+def app_css():
+    if request.headers.get("If-None-Match") == _CSS_ETAG:
+        return Response(status=304, headers={"ETag": _CSS_ETAG})
+    return Response(_CSS_BYTES, mimetype="text/css",
+                    headers={"ETag": _CSS_ETAG, "Cache-Control": "public, max-age=31536000, immutable"})
 
 @app.route("/api/status")
 def api_status():
+    return _json_response({"status": dict(current_status), "task_count": len(_history_snapshot), "model": STYX_MODEL})
+
+@app.route("/api/state")
+def api_state():
+    """Status, model and tasks (newest first) in one payload, what the UI polls."""
+    # Read the version before the data: if a writer lands in between, the
+    # tag is older than the body and the next poll just refetches.
+    etag = f'"{_history_boot}-s{_state_version}"'
+    if request.headers.get("If-None-Match") == etag:
+        return Response(status=304, headers={"ETag": etag})
+    resp = _json_response({"status": dict(current_status), "model": STYX_MODEL,
+                           "boot": _history_boot, "tasks": _history_newest_first[1]})
+    resp.headers["ETag"] = etag
+    return resp
+
+@app.route("/api/stream")
+def api_stream():
+    """Server-sent events: the full state once, then whatever changed.
+
+    Each event carries status and model; tasks (newest first) only when the
+    history itself changed. A comment line every 15 s keeps the connection
+    alive. At most MAX_STREAMS are open at once (503 past that), and each
+    checks for a hung-up client every second so its thread is freed quickly.
+    """
+    global _open_streams
     with history_lock:
-        return jsonify({"status": current_status, "task_count": len(task_history), "model": STYX_MODEL})
+        if _open_streams >= MAX_STREAMS:
+            return _json_response({"error": "Too many open streams"}, 503)
+        _open_streams += 1
+    # Outside waitress (flask run, tests) there is no disconnect check
+    disconnected = request.environ.get("waitress.client_disconnected", lambda: False)
+
+    def events():
+        seen, sent_tasks, idle = None, None, 0
+        while not disconnected():
+            with _state_changed:
+                _state_changed.wait_for(lambda: _state_version != seen, timeout=1)
+                version, status, (_, tasks) = _state_version, dict(current_status), _history_newest_first
+            if version == seen:
+                idle += 1
+                if idle >= 15:
+                    idle = 0
+                    yield b": keepalive\n\n"
+                continue
+            seen, idle = version, 0
+            payload = {"status": status, "model": STYX_MODEL, "boot": _history_boot}
+            if tasks is not sent_tasks:
+                payload["tasks"] = sent_tasks = tasks
+            yield b"data: " + orjson.dumps(payload, option=orjson.OPT_SORT_KEYS) + b"\n\n"
+
+    def release():
+        global _open_streams
+        with history_lock:
+            _open_streams -= 1
+
+    resp = Response(events(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    # close() runs however the response ends, even if it was never iterated
+    resp.call_on_close(release)
+    return resp
 
 @app.route("/api/tasks")
 def api_tasks():
-    with history_lock: return jsonify(list(reversed(task_history)))
+    etag, tasks = _history_newest_first
+    if request.headers.get("If-None-Match") == etag:
+        return Response(status=304, headers={"ETag": etag})
+    resp = _json_response(tasks)
+    resp.headers["ETag"] = etag
+    return resp
 @app.route("/api/tasks/<int:task_id>")
 def api_task_detail(task_id):
-    with history_lock:
-        if 0 <= task_id < len(task_history): return jsonify(task_history[task_id])
-        return jsonify({"error": "not found"}), 404
+    task = _history_by_id.get(task_id)
+    if task is not None: return _json_response(task)
+    return _json_response({"error": "not found"}, 404)
 
 @app.route("/api/evaluate", methods=["POST"])
 def api_evaluate_now():
+    # Check and claim the busy state in one step so a double-click (or a
+    # watcher run already in progress) can't start a second paid evaluation
+    with history_lock:
+        if current_status["state"] in ("extracting", "evaluating"):
+            return jsonify({"ok": False, "error": "An evaluation is already running"}), 409
+        _set_status("evaluating", f"Claude {STYX_MODEL} is thinking...")
     def _run():
-        with history_lock:
-            current_status["state"] = "evaluating"
-            current_status["message"] = f"Claude {STYX_MODEL} is thinking..."
         try:
             result = evaluate()
             if "error" in result:
                 with history_lock:
-                    current_status["state"] = "error"
-                    current_status["message"] = result["error"]
+                    _set_status("error", result["error"])
                 return
-            result["_meta"] = {"filename":"manual","timestamp":datetime.now().strftime("%Y-%m-%d %H:%M:%S"),"id":len(task_history)}
-            result_file = SCRIPT_DIR / "result.json"
-            with open(result_file, "w", encoding="utf-8") as f:
-                json.dump(result, f, indent=2, ensure_ascii=False)
+            result["_meta"] = {"filename":"manual","timestamp":datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+            _save_json(SCRIPT_DIR / "result.json", result)
             with history_lock:
-                task_history.append(result)
-                current_status["state"] = "complete"
-                current_status["message"] = "Evaluation complete"
+                _add_history(result)
+                _set_status("complete", "Evaluation complete")
         except Exception as e:
             with history_lock:
-                current_status["state"] = "error"
-                current_status["message"] = str(e)
+                _set_status("error", str(e))
     threading.Thread(target=_run, daemon=True).start()
     return jsonify({"ok": True})
 @app.route("/api/current")
 def api_current():
-    with history_lock:
-        if task_history: return jsonify(task_history[-1])
-        return jsonify(None)
+    snap = _history_snapshot
+    return _json_response(snap[-1] if snap else None)
 
 @app.route("/api/history/clear", methods=["POST"])
 def api_history_clear():
     with history_lock:
         if len(task_history) > 1:
-            latest = task_history[-1]
+            latest_id = next(reversed(task_history))
+            latest = task_history[latest_id]
             task_history.clear()
-            task_history.append(latest)
-            latest["_meta"]["id"] = 0
+            task_history[latest_id] = latest
+            _publish_history()
         return jsonify({"ok": True, "remaining": len(task_history)})
 
 @app.route("/api/fill-form", methods=["POST"])
@@ -317,7 +453,7 @@ def api_scan():
             method='POST'
         )
         resp = _ur.urlopen(req, timeout=15)
-        result = json.loads(resp.read().decode())
+        result = orjson.loads(resp.read())
         return jsonify(result)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -325,20 +461,14 @@ def api_scan():
 @app.route("/api/history/<int:task_id>", methods=["DELETE"])
 def api_history_delete(task_id):
     with history_lock:
-        task_history[:] = [t for t in task_history if (t.get("_meta") or {}).get("id") != task_id]
-        for i, t in enumerate(task_history):
-            t.setdefault("_meta", {})["id"] = i
+        if task_history.pop(task_id, None) is not None:
+            _publish_history()
         return jsonify({"ok": True, "remaining": len(task_history)})
-# ── HTML Template ───────────────────────────────────────────────────────
-HTML_TEMPLATE = r'''<!DOCTYPE html>
-<html lang="en">
-<head>
-<meta charset="UTF-8">
-<meta name="viewport" content="width=device-width, initial-scale=1.0">
-<title>Task Evaluator</title>
-<link href="https://fonts.googleapis.com/css2?family=DM+Mono:wght@400;500&family=Instrument+Serif&family=Manrope:wght@300;400;500;600;700&display=swap" rel="stylesheet">
-<style>
-  :root {
+# ── Stylesheet ──────────────────────────────────────────────────────────
+# Served from /static/app.css rather than inlined in the page. The page links
+# it with ?v=<content hash>, so the browser can cache it for good and a
+# changed stylesheet simply gets a new URL.
+APP_CSS = r'''  :root {
     --bg:#0c0c10;--surface:#151519;--surface-2:#1c1c24;--surface-3:#24242e;
     --border:#2a2a36;--border-hover:#3c3c50;
     --text:#dddde4;--text-dim:#6e6e82;--text-bright:#f4f4f8;
@@ -364,6 +494,7 @@ HTML_TEMPLATE = r'''<!DOCTYPE html>
   .btn{font-family:'DM Mono',monospace;font-size:11px;padding:7px 16px;border-radius:6px;border:1px solid var(--border);background:var(--surface-2);color:var(--text-dim);cursor:pointer;transition:all 0.2s;}
   .btn:hover{border-color:var(--gold);color:var(--gold);}
   .btn:active{transform:scale(0.97);}
+  .btn:disabled{opacity:0.5;cursor:default;pointer-events:none;}
   .hamburger{width:36px;height:36px;border-radius:8px;border:1px solid var(--border);background:var(--surface-2);color:var(--text-dim);cursor:pointer;display:flex;align-items:center;justify-content:center;font-size:18px;transition:all 0.2s;}
   .hamburger:hover{border-color:var(--gold);color:var(--gold);}
   .main{position:relative;z-index:1;max-width:1000px;margin:0 auto;padding:32px 24px;}
@@ -373,7 +504,7 @@ HTML_TEMPLATE = r'''<!DOCTYPE html>
   .empty p{font-size:14px;color:var(--text-dim);line-height:1.7;max-width:420px;margin:0 auto;}
   .empty kbd{font-family:'DM Mono',monospace;font-size:11px;background:var(--surface-2);padding:2px 8px;border-radius:4px;border:1px solid var(--border);color:var(--gold);}
   .spinner-block{display:flex;align-items:center;justify-content:center;gap:12px;padding:80px 0;color:var(--text-dim);font-size:14px;animation:fadeUp 0.4s ease-out;}
-  .spinner-ring{width:20px;height:20px;border:2px solid var(--border);border-top-color:var(--gold);border-radius:50%;animation:spin 0.7s linear infinite;flex-shrink:0;}
+  .spinner-ring{width:20px;height:20px;border:2px solid var(--border);border-top-color:var(--gold);border-radius:50%;animation:spin 0.7s linear infinite;flex-shrink:0;will-change:transform;}
   @keyframes fadeUp{0%{opacity:0;transform:translateY(16px)}100%{opacity:1;transform:translateY(0)}}
   @keyframes spin{to{transform:rotate(360deg)}}  .current-card{background:var(--surface);border:1px solid var(--border);border-radius:14px;overflow:hidden;animation:cardIn 0.45s cubic-bezier(0.16,1,0.3,1);transition:border-color 0.3s;}
   .current-card:hover{border-color:var(--border-hover);}
@@ -418,14 +549,16 @@ HTML_TEMPLATE = r'''<!DOCTYPE html>
   .card-actions{display:flex;gap:8px;margin-top:8px;}
   .card-actions .btn{font-size:10px;padding:5px 12px;}  .sidebar-overlay{position:fixed;inset:0;background:rgba(0,0,0,0.5);z-index:200;opacity:0;pointer-events:none;transition:opacity 0.3s;}
   .sidebar-overlay.open{opacity:1;pointer-events:auto;}
-  .sidebar{position:fixed;top:0;right:-380px;width:380px;height:100vh;background:var(--surface);border-left:1px solid var(--border);z-index:201;transition:right 0.35s cubic-bezier(0.16,1,0.3,1);display:flex;flex-direction:column;}
-  .sidebar.open{right:0;}
+  .sidebar{position:fixed;top:0;right:0;width:380px;height:100vh;background:var(--surface);border-left:1px solid var(--border);z-index:201;transform:translateX(100%);transition:transform 0.35s cubic-bezier(0.16,1,0.3,1);display:flex;flex-direction:column;}
+  .sidebar.open{transform:translateX(0);}
   .sidebar-head{padding:18px 20px;border-bottom:1px solid var(--border);display:flex;align-items:center;justify-content:space-between;flex-shrink:0;}
   .sidebar-head h3{font-family:'Instrument Serif',serif;font-size:20px;color:var(--text-bright);}
   .sidebar-head .close-btn{width:32px;height:32px;border-radius:8px;border:1px solid var(--border);background:var(--surface-2);color:var(--text-dim);cursor:pointer;display:flex;align-items:center;justify-content:center;font-size:16px;}
   .sidebar-head .close-btn:hover{color:var(--red);border-color:var(--red);}
   .sidebar-actions{padding:12px 20px;border-bottom:1px solid var(--border);flex-shrink:0;}
-  .sidebar-list{flex:1;overflow-y:auto;padding:12px 20px;}
+  .sidebar-list{flex:1;overflow-y:auto;padding:12px 20px;position:relative;}
+  .history-window{position:relative;}
+  .history-window .history-item{position:absolute;left:0;right:0;height:56px;margin:0;}
   .history-item{background:var(--surface-2);border:1px solid var(--border);border-radius:10px;padding:12px 14px;margin-bottom:10px;display:flex;align-items:center;justify-content:space-between;transition:border-color 0.2s;cursor:pointer;}
   .history-item:hover{border-color:var(--border-hover);}
   .history-item.active{border-color:var(--gold);}
@@ -447,7 +580,20 @@ HTML_TEMPLATE = r'''<!DOCTYPE html>
   .comp-badge{background:var(--surface-2);border:1px solid var(--border);border-radius:10px;padding:10px 16px;text-align:center;min-width:160px;flex:1;}
   .cb-label{font-family:'DM Mono',monospace;font-size:9px;color:var(--text-dim);text-transform:uppercase;letter-spacing:1.5px;margin-bottom:4px;}
   .cb-value{font-size:14px;font-weight:600;}
-</style>
+'''
+_CSS_BYTES = APP_CSS.encode()
+_CSS_VERSION = hashlib.sha1(_CSS_BYTES).hexdigest()[:12]
+_CSS_ETAG = f'"{_CSS_VERSION}"'
+
+# ── HTML Template ───────────────────────────────────────────────────────
+HTML_TEMPLATE = r'''<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<title>Task Evaluator</title>
+<link href="https://fonts.googleapis.com/css2?family=DM+Mono:wght@400;500&family=Instrument+Serif&family=Manrope:wght@300;400;500;600;700&display=swap" rel="stylesheet">
+<link rel="stylesheet" href="/static/app.css?v={{ css_version }}">
 </head>
 <body>
 <div class="header">
@@ -456,7 +602,7 @@ HTML_TEMPLATE = r'''<!DOCTYPE html>
     <div class="status-pill" id="statusPill" data-state="idle"><div class="dot"></div><span id="statusText">Connecting...</span></div>
   </div>
   <div class="header-right">
-    <button class="btn" onclick="evaluateNow()">▶ Evaluate Now</button>
+    <button class="btn" onclick="evaluateNow()" id="evalBtn">▶ Evaluate Now</button>
     <button class="btn" onclick="fillForm()" id="fillBtn">⌨ Fill Form</button>
     <button class="btn" id="modelBadge">—</button>
     <button class="hamburger" onclick="toggleSidebar()" title="History">☰</button>
@@ -477,26 +623,54 @@ HTML_TEMPLATE = r'''<!DOCTYPE html>
 <div class="sidebar" id="sidebar">
   <div class="sidebar-head"><h3>History</h3><button class="close-btn" onclick="toggleSidebar()">✕</button></div>
   <div class="sidebar-actions"><button class="btn" style="width:100%" onclick="clearHistory()">🗑 Clear All History</button></div>
-  <div class="sidebar-list" id="historyList"><div class="sidebar-empty" id="historyEmpty">No history yet.</div></div>
+  <div class="sidebar-list" id="historyList"><div class="sidebar-empty" id="historyEmpty">No history yet.</div><div class="history-window" id="historyWindow"></div></div>
 </div>
+<template id="cardTpl"><div class="current-card"><div class="card-header"><div class="card-header-left"><div class="card-icon">⭐</div><div class="card-info"><h3></h3><span></span></div></div><div class="card-header-right"><span class="tag tag-type"></span><span class="tag tag-tokens"></span></div></div><div class="card-body"><div class="card-actions"><button class="btn" onclick="copyText('just')">📋 Copy Justification</button><button class="btn" onclick="copyText('json')">📋 Copy JSON</button></div></div></div></template>
+<template id="historyRowTpl"><div class="history-item"><div class="hi-left" data-action="load"><h4></h4><span></span></div><button class="hi-delete" data-action="del" title="Delete">✕</button></div></template>
 <script>
-const emptyState=document.getElementById('emptyState'),spinnerState=document.getElementById('spinnerState'),spinnerText=document.getElementById('spinnerText'),currentTask=document.getElementById('currentTask'),statusPill=document.getElementById('statusPill'),statusText=document.getElementById('statusText'),modelBadge=document.getElementById('modelBadge'),sidebar=document.getElementById('sidebar'),sidebarOverlay=document.getElementById('sidebarOverlay'),historyList=document.getElementById('historyList'),historyEmpty=document.getElementById('historyEmpty');
-let lastRenderedId=null,allTasks=[];
-
+const emptyState=document.getElementById('emptyState'),spinnerState=document.getElementById('spinnerState'),spinnerText=document.getElementById('spinnerText'),currentTask=document.getElementById('currentTask'),statusPill=document.getElementById('statusPill'),statusText=document.getElementById('statusText'),modelBadge=document.getElementById('modelBadge'),sidebar=document.getElementById('sidebar'),sidebarOverlay=document.getElementById('sidebarOverlay'),historyList=document.getElementById('historyList'),historyEmpty=document.getElementById('historyEmpty'),historyWindow=document.getElementById('historyWindow');
+// Card and history-row skeletons; task strings go in through textContent
+const cardTpl=document.getElementById('cardTpl').content.firstElementChild,historyRowTpl=document.getElementById('historyRowTpl').content.firstElementChild;
+// allTasks is newest first, as the server sends it
+let lastRenderedId=null,lastHistoryKey=null,allTasks=[],stateEtag='',currentLoadedTask=null;
+// renderEval output by task id, oldest evicted past 32. Ids are only unique
+// within one server process, so applyBoot() clears it when the server restarts.
+// This is also what keeps the raw-response/long-text escaping to once per
+// task: poll results are fresh objects, so memoizing on the task wouldn't stick.
+const evalCache=new Map(),EVAL_CACHE_MAX=32;
+
+const ESC={'&':'&amp;','<':'&lt;','>':'&gt;','"':'&quot;',"'":'&#39;'},ESC_RE=/[&<>"']/g;
+function esc(s){return String(s).replace(ESC_RE,c=>ESC[c]);}
 function prettyKey(k){return k.replace(/_/g,' ').replace(/\b\w/g,c=>c.toUpperCase());}
+// Checked in order, first match wins; built once instead of per cell
+const VAL_COLOR_RULES=[
+  [/no.?issues|amazing|excellent|accurate|approve|much better|^5/,'var(--green)'],
+  [/pretty good|better|mostly|^4/,'var(--cyan)'],
+  [/minor|okay|same|about|^3/,'var(--amber)'],
+  [/major|pretty bad|worse|inaccurate|reject|^2|horrible|^1/,'var(--red)'],
+  [/not.?applicable|n\/a/,'var(--text-dim)'],
+];
 function valColor(v){
   if(!v||typeof v!=='string')return'var(--text)';const l=v.toLowerCase();
-  if(/no.?issues|amazing|excellent|accurate|approve|much better|^5/i.test(l))return'var(--green)';
-  if(/pretty good|better|mostly|^4/i.test(l))return'var(--cyan)';
-  if(/minor|okay|same|about|^3/i.test(l))return'var(--amber)';
-  if(/major|pretty bad|worse|inaccurate|reject|^2|horrible|^1/i.test(l))return'var(--red)';
-  if(/not.?applicable|n\/a/i.test(l))return'var(--text-dim)';
+  for(const[re,c]of VAL_COLOR_RULES)if(re.test(l))return c;
   return'var(--text)';
 }
 
 function renderEval(task){
-  const ev=task.evaluation||{};let h='';
-  if(ev.parse_error){h+=`<div class="justification"><h4>Raw Response</h4><p>${(ev.raw_response||task.raw_response||'').replace(/</g,'&lt;')}</p></div>`;return h;}
+  const key=task._meta?.id??task.title;
+  if(key===undefined)return buildEval(task);
+  let h=evalCache.get(key);
+  if(h===undefined){
+    h=buildEval(task);evalCache.set(key,h);
+    if(evalCache.size>EVAL_CACHE_MAX)evalCache.delete(evalCache.keys().next().value);
+  }
+  return h;
+}
+// Key classification for buildEval, compiled once
+const MODEL_KEY_RE=/^(model_[a-z]|response_[a-z])_(.+)$/i,COMPARATIVE_KEY_RE=/which|comparative|sxs|vs|better|preference/i;
+function buildEval(task){
+  const ev=task.evaluation||{};
+  if(ev.parse_error)return`<div class="justification"><h4>${ev.truncated?'Raw Response (cut off at the token limit)':'Raw Response'}</h4><p>${esc(ev.raw_response||task.raw_response||'')}</p></div>`;
   // Smart grouping: detect if keys follow "model_X_axis" or "response_X" patterns, or are nested objects
   const entries=Object.entries(ev);
   // 1. Check for nested object structure (response_a:{...}, response_b:{...})
@@ -504,15 +678,15 @@ function renderEval(task){
   for(const[k,v]of entries){
     // Skip empty/blank fields
     if(v===''||v===null||v===undefined)continue;
-    if(typeof v==='string'&&v.trim()===''&&/comment|optional|additional/i.test(k))continue;
+    if(typeof v==='string'&&v.trim()===''){const lk=k.toLowerCase();if(lk.includes('comment')||lk.includes('optional')||lk.includes('additional'))continue;}
     if(v&&typeof v==='object'&&!Array.isArray(v)){nestedModels[k]=v;continue;}
     if(typeof v==='string'&&v.length>120){texts.push([k,v]);continue;}
     if(Array.isArray(v)){texts.push([k,v.join('\\n• ')]);continue;}
     // Check if flat key matches model_X_axis pattern
-    const mm=k.match(/^(model_[a-z]|response_[a-z])_(.+)$/i);
+    const mm=MODEL_KEY_RE.exec(k);
     if(mm){const mk=mm[1],ax=mm[2];if(!flatModels[mk])flatModels[mk]={};flatModels[mk][ax]=v;continue;}
     // Check if it's a comparative (which_response, sxs, comparative, etc)
-    if(/which|comparative|sxs|vs|better|preference/i.test(k)){comparatives.push([k,v]);continue;}
+    if(COMPARATIVE_KEY_RE.test(k)){comparatives.push([k,v]);continue;}
     // Short misc value
     if(typeof v==='string'&&v.length<=120)comparatives.push([k,v]);
   }
@@ -520,74 +694,164 @@ function renderEval(task){
   const allModels={...nestedModels};
   for(const[mk,axes]of Object.entries(flatModels)){if(!allModels[mk])allModels[mk]={};Object.assign(allModels[mk],axes);}
   const modelKeys=Object.keys(allModels);
+  // Pieces are collected and joined once at the end
+  const out=[];
   // Render comparison table if we have models
   if(modelKeys.length>0){
-    // Collect all axes across all models
-    const allAxes=new Set();
-    for(const axes of Object.values(allModels))for(const ak of Object.keys(axes)){if(typeof axes[ak]==='string'&&axes[ak].length<=120)allAxes.add(ak);}
-    const axesList=[...allAxes];
-    h+='<div style="overflow-x:auto;margin-bottom:16px"><table class="eval-table"><thead><tr><th>Axis</th>';
-    for(const mk of modelKeys)h+=`<th>${prettyKey(mk)}</th>`;
-    h+='</tr></thead><tbody>';
+    // One pass over every model's axes fills each axis row's cells (by
+    // model column); an axis gets a row once some model has a short string
+    // for it, in the order that first happens
+    const rows=new Map(),axesList=[];
+    modelKeys.forEach((mk,i)=>{
+      for(const[ak,v]of Object.entries(allModels[mk])){
+        let r=rows.get(ak);
+        if(!r)rows.set(ak,r={cells:new Array(modelKeys.length),shown:false});
+        r.cells[i]=v;
+        if(!r.shown&&typeof v==='string'&&v.length<=120){r.shown=true;axesList.push(ak);}
+      }
+    });
+    out.push('<div style="overflow-x:auto;margin-bottom:16px"><table class="eval-table"><thead><tr><th>Axis</th>');
+    for(const mk of modelKeys)out.push(`<th>${prettyKey(mk)}</th>`);
+    out.push('</tr></thead><tbody>');
     for(const ax of axesList){
-      h+=`<tr><td class="axis-name">${prettyKey(ax)}</td>`;
-      for(const mk of modelKeys){const v=allModels[mk][ax]||'—';h+=`<td><span class="tv" style="color:${valColor(String(v))}">${v}</span></td>`;}
-      h+='</tr>';
+      out.push(`<tr><td class="axis-name">${prettyKey(ax)}</td>`);
+      for(const c of rows.get(ax).cells){const v=c||'—';out.push(`<td><span class="tv" style="color:${valColor(String(v))}">${esc(v)}</span></td>`);}
+      out.push('</tr>');
     }
-    h+='</tbody></table></div>';
+    out.push('</tbody></table></div>');
   }
   // Render comparatives
   if(comparatives.length){
-    h+='<div style="display:flex;flex-wrap:wrap;gap:8px;margin-bottom:16px">';
-    for(const[k,v]of comparatives){const sv=String(v);h+=`<div class="comp-badge"><div class="cb-label">${prettyKey(k)}</div><div class="cb-value" style="color:${valColor(sv)}">${sv}</div></div>`;}
-    h+='</div>';
+    out.push('<div style="display:flex;flex-wrap:wrap;gap:8px;margin-bottom:16px">');
+    for(const[k,v]of comparatives){const sv=String(v);out.push(`<div class="comp-badge"><div class="cb-label">${prettyKey(k)}</div><div class="cb-value" style="color:${valColor(sv)}">${esc(sv)}</div></div>`);}
+    out.push('</div>');
   }
   // Render long texts
-  for(const[k,v]of texts)h+=`<div class="justification"><h4>${prettyKey(k)}</h4><p>${String(v).replace(/</g,'&lt;')}</p></div>`;
-  return h;
+  for(const[k,v]of texts)out.push(`<div class="justification"><h4>${prettyKey(k)}</h4><p>${esc(v)}</p></div>`);
+  return out.join('');
+}
+// Sets will-change only while el's own transition/animation runs, so the
+// compositor layer is dropped once it has finished
+function promoteUntil(el,props,evt){
+  el.style.willChange=props;
+  const done=e=>{if(e.target!==el)return;el.style.willChange='auto';el.removeEventListener(evt,done);};
+  el.addEventListener(evt,done);
 }
 function renderCurrent(t){
+  currentLoadedTask=t;
   const m=t._meta||{},tt=t.task_type||'fresh',u=t.usage||{};
   let tok='';if(u.input_tokens)tok=`${(u.input_tokens/1000).toFixed(1)}k in / ${(u.output_tokens/1000).toFixed(1)}k out`;
-  currentTask.innerHTML=`<div class="current-card"><div class="card-header"><div class="card-header-left"><div class="card-icon">⭐</div><div class="card-info"><h3>${t.title||m.filename||'Task'}</h3><span>${m.timestamp||''}</span></div></div><div class="card-header-right"><span class="tag tag-${tt}">${tt}</span>${tok?`<span class="tag tag-tokens">${tok}</span>`:''}</div></div><div class="card-body">${renderEval(t)}<div class="card-actions"><button class="btn" onclick="copyText('just')">📋 Copy Justification</button><button class="btn" onclick="copyText('json')">📋 Copy JSON</button></div></div></div>`;
+  const card=cardTpl.cloneNode(true);
+  card.querySelector('.card-info h3').textContent=t.title||m.filename||'Task';
+  card.querySelector('.card-info span').textContent=m.timestamp||'';
+  const typeTag=card.querySelector('.tag-type');typeTag.className='tag tag-'+tt;typeTag.textContent=tt;
+  const tokTag=card.querySelector('.tag-tokens');if(tok)tokTag.textContent=tok;else tokTag.remove();
+  card.querySelector('.card-body').insertAdjacentHTML('afterbegin',renderEval(t));
+  currentTask.replaceChildren(card);
+  promoteUntil(card,'transform, opacity','animationend');
 }
 
-function renderHistory(){
-  historyList.querySelectorAll('.history-item').forEach(e=>e.remove());
-  if(!allTasks.length){historyEmpty.style.display='';return;}
-  historyEmpty.style.display='none';
-  const cur=allTasks.length?allTasks[allTasks.length-1]._meta?.id:null;
-  [...allTasks].reverse().forEach(t=>{
-    const m=t._meta||{},el=document.createElement('div');
-    el.className='history-item'+(m.id===cur?' active':'');
-    el.innerHTML=`<div class="hi-left" onclick="loadItem(${m.id})"><h4>${t.title||m.filename||'Task'}</h4><span>${m.timestamp||''}</span></div><button class="hi-delete" onclick="event.stopPropagation();delItem(${m.id})" title="Delete">✕</button>`;
-    historyList.appendChild(el);
-  });
+// History rows have a fixed height and sit absolutely inside a spacer as
+// tall as the whole list, so only the rows in view (plus some overscan)
+// exist in the DOM. HIST_ROW is the 56px row plus the 10px gap.
+const HIST_ROW=66,HIST_OVERSCAN=5;
+let histRange='',histQueued=false,histCurrentId=null;
+// currentId is the latest task's id, marked active; the caller has it already
+function renderHistory(currentId=null){
+  histCurrentId=currentId;
+  const n=allTasks.length;
+  historyEmpty.style.display=n?'none':'';
+  historyWindow.style.height=n?(n*HIST_ROW-10)+'px':'0';
+  histRange='';renderHistoryWindow();
 }
-
-window.toggleSidebar=function(){sidebar.classList.toggle('open');sidebarOverlay.classList.toggle('open');};
-window.evaluateNow=function(){fetch('/api/evaluate',{method:'POST'});};
-window.fillForm=function(){const b=document.getElementById('fillBtn');const o=b.textContent;b.textContent='Sending...';fetch('/api/fill-form',{method:'POST'}).then(r=>r.json()).then(d=>{b.textContent=d.ok?'✓ Sent':'✗ Error';setTimeout(()=>b.textContent=o,2000);}).catch(()=>{b.textContent='✗ Error';setTimeout(()=>b.textContent=o,2000);});};
-window.copyText=function(type){fetch('/api/current').then(r=>r.json()).then(t=>{if(!t)return;let txt;if(type==='json'){txt=JSON.stringify(t.evaluation||{},null,2);}else{const ev=t.evaluation||{};const texts=[];for(const[k,v]of Object.entries(ev)){if(typeof v==='string'&&v.length>80)texts.push(v);if(Array.isArray(v))texts.push(v.join('\\n'));}txt=texts.join('\\n\\n')||t.raw_response||'';}navigator.clipboard.writeText(txt).then(()=>{const btns=document.querySelectorAll('.card-actions .btn');const b=type==='json'?btns[1]:btns[0];if(b){const o=b.textContent;b.textContent='✓ Copied';setTimeout(()=>b.textContent=o,1200);}});});};
-window.loadItem=function(id){const t=allTasks.find(x=>(x._meta||{}).id===id);if(t){renderCurrent(t);renderHistory();}toggleSidebar();};
+function renderHistoryWindow(){
+  const n=allTasks.length,top=Math.max(0,historyList.scrollTop-historyWindow.offsetTop);
+  const first=Math.max(0,Math.floor(top/HIST_ROW)-HIST_OVERSCAN);
+  const last=Math.min(n,Math.ceil((top+historyList.clientHeight)/HIST_ROW)+HIST_OVERSCAN);
+  const range=first+':'+last;
+  if(range===histRange)return;
+  histRange=range;
+  const cur=histCurrentId;
+  const frag=document.createDocumentFragment();
+  for(let i=first;i<last;i++){
+    const t=allTasks[i],m=t._meta||{},el=historyRowTpl.cloneNode(true),left=el.firstElementChild;
+    if(m.id===cur)el.classList.add('active');
+    el.style.top=(i*HIST_ROW)+'px';
+    left.dataset.id=el.lastElementChild.dataset.id=m.id;
+    left.firstElementChild.textContent=t.title||m.filename||'Task';
+    left.lastElementChild.textContent=m.timestamp||'';
+    frag.appendChild(el);
+  }
+  historyWindow.replaceChildren(frag);
+}
+function queueHistoryWindow(){
+  if(histQueued)return;histQueued=true;
+  requestAnimationFrame(()=>{histQueued=false;renderHistoryWindow();});
+}
+historyList.addEventListener('scroll',queueHistoryWindow,{passive:true});
+// One listener for every row's load/delete, reading the id off data-id
+historyList.addEventListener('click',e=>{
+  const a=e.target.closest('[data-action]');if(!a)return;
+  const id=+a.dataset.id;
+  if(a.dataset.action==='load')loadItem(id);else{e.stopPropagation();delItem(id);}
+});
+window.addEventListener('resize',queueHistoryWindow);
+
+window.toggleSidebar=function(){promoteUntil(sidebar,'transform','transitionend');promoteUntil(sidebarOverlay,'opacity','transitionend');sidebar.classList.toggle('open');sidebarOverlay.classList.toggle('open');};
+// Disables the button until its request settles, swallowing repeat clicks
+function busyClick(b,req){if(b.disabled)return;b.disabled=true;req().finally(()=>{b.disabled=false;});}
+window.evaluateNow=function(){busyClick(document.getElementById('evalBtn'),()=>fetch('/api/evaluate',{method:'POST'}).catch(()=>{}));};
+window.fillForm=function(){const b=document.getElementById('fillBtn');busyClick(b,()=>{const o=b.textContent;b.textContent='Sending...';return fetch('/api/fill-form',{method:'POST'}).then(r=>r.json()).then(d=>{b.textContent=d.ok?'✓ Sent':'✗ Error';setTimeout(()=>b.textContent=o,2000);}).catch(()=>{b.textContent='✗ Error';setTimeout(()=>b.textContent=o,2000);});});};
+// Copies from the task on screen, which is already in memory; the pretty
+// JSON is kept on the task after the first copy (tasks never change)
+window.copyText=function(type){const t=currentLoadedTask;if(!t)return;let txt;if(type==='json'){txt=t._evalPretty??(t._evalPretty=JSON.stringify(t.evaluation||{},null,2));}else{const ev=t.evaluation||{};const texts=[];for(const[k,v]of Object.entries(ev)){if(typeof v==='string'&&v.length>80)texts.push(v);if(Array.isArray(v))texts.push(v.join('\\n'));}txt=texts.join('\\n\\n')||t.raw_response||'';}navigator.clipboard.writeText(txt).then(()=>{const btns=document.querySelectorAll('.card-actions .btn');const b=type==='json'?btns[1]:btns[0];if(b){const o=b.textContent;b.textContent='✓ Copied';setTimeout(()=>b.textContent=o,1200);}});};
+window.loadItem=function(id){const t=allTasks.find(x=>(x._meta||{}).id===id);if(t){renderCurrent(t);renderHistory(lastRenderedId);}toggleSidebar();};
 window.delItem=function(id){fetch(`/api/history/${id}`,{method:'DELETE'}).then(()=>poll());};
 window.clearHistory=function(){fetch('/api/history/clear',{method:'POST'}).then(()=>poll());};
+// Last values written to the header, so unchanged ones aren't rewritten
+let lastState='',lastMsg='',lastModel='';
+function applyStatus(d){
+  if(d.status.state!==lastState){statusPill.dataset.state=lastState=d.status.state;}
+  if(d.status.message!==lastMsg){statusText.textContent=lastMsg=d.status.message;}
+  if(d.model!==lastModel){modelBadge.textContent=lastModel=d.model;}
+  if(d.status.state==='evaluating'||d.status.state==='extracting'){spinnerState.style.display='';spinnerText.textContent=d.status.message;emptyState.style.display='none';}
+  else{spinnerState.style.display='none';}
+}
+// A new boot id means a restarted server whose task ids start over at 0, so
+// nothing cached or rendered under the old ids can be trusted
+let serverBoot='';
+function applyBoot(boot){
+  if(!boot||boot===serverBoot)return;
+  if(serverBoot){evalCache.clear();lastRenderedId=null;lastHistoryKey=null;}
+  serverBoot=boot;
+}
+function applyTasks(tasks){
+  allTasks=tasks;
+  if(!allTasks.length){emptyState.style.display='';currentTask.innerHTML='';currentLoadedTask=null;renderHistory();lastHistoryKey='';return;}
+  emptyState.style.display='none';
+  const latest=allTasks[0],lid=(latest._meta||{}).id;
+  if(lid!==lastRenderedId){renderCurrent(latest);lastRenderedId=lid;}
+  const hk=allTasks.map(t=>(t._meta||{}).id).join(',');
+  if(hk!==lastHistoryKey){renderHistory(lid);lastHistoryKey=hk;}
+}
+// One-shot refresh, used after actions and while the stream is down
 function poll(){
-  fetch('/api/status').then(r=>r.json()).then(d=>{
-    statusPill.dataset.state=d.status.state;statusText.textContent=d.status.message;modelBadge.textContent=d.model;
-    if(d.status.state==='evaluating'||d.status.state==='extracting'){spinnerState.style.display='';spinnerText.textContent=d.status.message;emptyState.style.display='none';}
-    else{spinnerState.style.display='none';}
-  }).catch(()=>{});
-  fetch('/api/tasks').then(r=>r.json()).then(tasks=>{
-    allTasks=tasks.reverse();
-    if(!allTasks.length){emptyState.style.display='';currentTask.innerHTML='';renderHistory();return;}
-    emptyState.style.display='none';
-    const latest=allTasks[allTasks.length-1],lid=(latest._meta||{}).id;
-    if(lid!==lastRenderedId){renderCurrent(latest);lastRenderedId=lid;}
-    renderHistory();
-  }).catch(()=>{});
+  fetch('/api/state',{headers:stateEtag?{'If-None-Match':stateEtag}:{}}).then(r=>{
+    if(r.status===304)return null;
+    stateEtag=r.headers.get('ETag')||'';return r.json();
+  }).then(d=>{if(d){applyBoot(d.boot);applyStatus(d);applyTasks(d.tasks);}}).catch(()=>{});
 }
-setInterval(poll,2000);poll();
+// The server pushes state over SSE only when it changes. The stream stays
+// open while the tab is hidden: each reconnect holds a server thread until
+// the old one is noticed as gone, so reconnecting on every tab switch adds up.
+// If the server refuses the stream (503, too many open), poll and retry later.
+let stream=null;
+function openStream(){
+  stream=new EventSource('/api/stream');
+  stream.onmessage=e=>{const d=JSON.parse(e.data);applyBoot(d.boot);applyStatus(d);if(d.tasks)applyTasks(d.tasks);};
+  stream.onerror=()=>{poll();if(stream.readyState===EventSource.CLOSED){stream=null;setTimeout(openStream,5000);}};
+}
+openStream();
 </script>
 </body>
 </html>'''
@@ -599,8 +863,7 @@ def main():
         print("🧪 Dry run mode\n")
         result = evaluate(dry_run=True)
         if "error" in result: print(f"❌ {result['error']}"); sys.exit(1)
-        result_file = SCRIPT_DIR / "result.json"
-        with open(result_file, "w", encoding="utf-8") as f: json.dump(result, f, indent=2, ensure_ascii=False)
+        _save_json(SCRIPT_DIR / "result.json", result)
         print(f"💾 Saved to result.json")
         print(f"Task type: {result['task_type']}")
         print(f"System prompt: {result['system_prompt_length']:,} chars")
@@ -609,19 +872,17 @@ def main():
     if "--once" in args:
         result = evaluate()
         if "error" in result: print(f"❌ {result['error']}"); sys.exit(1)
-        result_file = SCRIPT_DIR / "result.json"
-        with open(result_file, "w", encoding="utf-8") as f: json.dump(result, f, indent=2, ensure_ascii=False)
+        _save_json(SCRIPT_DIR / "result.json", result)
         print(f"💾 Saved to result.json")
         usage = result.get("usage", {})
         print(f"Model: {result.get('model_used', '?')}")
         print(f"Tokens: {usage.get('input_tokens', 0):,} in / {usage.get('output_tokens', 0):,} out")
-        result["_meta"] = {"filename":"manual","timestamp":datetime.now().strftime("%Y-%m-%d %H:%M:%S"),"id":0}
-        task_history.append(result)
-        current_status["state"] = "complete"
-        current_status["message"] = "Evaluation complete"
+        result["_meta"] = {"filename":"manual","timestamp":datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+        with history_lock:
+            _add_history(result)
+            _set_status("complete", "Evaluation complete")
         threading.Timer(1.0, lambda: webbrowser.open(f"http://localhost:{PORT}")).start()
-        log = logging.getLogger("werkzeug"); log.setLevel(logging.WARNING)
-        app.run(host="127.0.0.1", port=PORT, debug=False)
+        serve(app, host="127.0.0.1", port=PORT, **SERVE_OPTS)
         return
     # ── Default: Watch mode + auto-evaluate + web UI ──
     no_eval = "--no-eval" in args
@@ -635,8 +896,7 @@ def main():
     cj = SCRIPT_DIR / "current.json"
     if cj.exists() and latest_task_data is None:
         try:
-            with open(cj, "r", encoding="utf-8") as f:
-                latest_task_data = json.load(f)
+            latest_task_data = orjson.loads(cj.read_bytes())
             nq = len(latest_task_data.get("questions", []))
             print(f"📂 Pre-loaded current.json ({nq} questions)")
         except Exception as e:
@@ -650,8 +910,7 @@ def main():
     print(f"   Press Ctrl+C to stop.\n")
     threading.Timer(1.5, lambda: webbrowser.open(f"http://localhost:{PORT}")).start()
     try:
-        log = logging.getLogger("werkzeug"); log.setLevel(logging.WARNING)
-        app.run(host="127.0.0.1", port=PORT, debug=False)
+        serve(app, host="127.0.0.1", port=PORT, **SERVE_OPTS)
     except KeyboardInterrupt: pass
     finally:
         observer.stop(); observer.join()
@@ -10,13 +10,15 @@ Fully generic — no assumptions about number of responses, rating axes,
 or option values. Adapts to whatever the extractor found.
 """
 
-import json
+import asyncio
+import functools
 import os
 import re
 import sys
+import time
 from pathlib import Path
 
-from anthropic import Anthropic
+import orjson
 from dotenv import load_dotenv
 
 # Load .env from the script's directory
@@ -27,6 +29,10 @@ ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
 STYX_MODEL = os.getenv("STYX_MODEL", "claude-opus-4-5-20251101")
 CURRENT_JSON = SCRIPT_DIR / "current.json"
 INSTRUCTIONS_MD = SCRIPT_DIR / "instructions.md"
+_KEY_STRIP_RE = re.compile(r'[^a-zA-Z0-9_\- ]')
+# Output budget per detect_task_type() result. A review answers the same
+# questions plus the worker-review fields, so it gets more room.
+MAX_TOKENS = {"fresh": 4096, "review": 6144}
 
 def detect_task_type(task_data: dict) -> str:
     """Detect whether this is a fresh evaluation or a Rate & Review."""
@@ -125,17 +131,19 @@ def build_instructions_text(task_data: dict) -> str:
         return "(No instructions found embedded in this task)"
     return "\n\n---\n\n".join(instructions)
 
+_EMPTY_SCHEMA = '{\n  "justification": "your detailed explanation"\n}'
+
 def build_json_schema(task_data: dict) -> str:
     """Dynamically build the expected JSON output schema from the actual questions."""
     questions = task_data.get("questions", [])
     if not questions:
-        return '{\n  "justification": "your detailed explanation"\n}'
+        return _EMPTY_SCHEMA
 
     parts = ["{"]
     for q in questions:
         label = q.get("label") or f"question_{q.get('number', '?')}"
         # Sanitize to make a valid JSON key
-        key = re.sub(r'[^a-zA-Z0-9_\- ]', '', label).strip().lower().replace(' ', '_').replace('-', '_')
+        key = _KEY_STRIP_RE.sub('', label).strip().lower().replace(' ', '_').replace('-', '_')
         if not key:
             key = f"q{q.get('number', 'x')}"
 
@@ -146,7 +154,8 @@ def build_json_schema(task_data: dict) -> str:
             opt_labels = [o.get("label", o.get("value", "?")) for o in q["options"] if o.get("label")]
             if opt_labels:
                 opts_str = " | ".join(opt_labels[:10])  # cap at 10 to avoid huge lines
-                parts.append(f'  "{key}": "{opts_str}",')
+                # Labels are page text and may hold quotes; encode so the block stays valid JSON
+                parts.append(f'  "{key}": {orjson.dumps(opts_str).decode()},')
             else:
                 parts.append(f'  "{key}": "your choice",')
         elif qtype == "checkbox":
@@ -158,8 +167,9 @@ def build_json_schema(task_data: dict) -> str:
     parts.append("}")
     return "\n".join(parts)
 
+@functools.lru_cache(maxsize=4)
 def build_system_prompt(instructions_md: str) -> str:
-    """Build the system prompt."""
+    """Build the system prompt. Pure in instructions_md, so repeat calls are cached."""
     return f"""You are an expert AI response evaluator for a data annotation platform.
 You provide top-quality, expert-level evaluations of AI-generated responses.
 
@@ -194,35 +204,33 @@ TASK TYPES:
 - For Rate & Review: also assess whether the worker's existing ratings and justification are accurate.
 """
 
-def build_user_prompt(task_data: dict) -> str:
-    """Build the complete user prompt — fully dynamic based on extracted data."""
-    task_type = detect_task_type(task_data)
-    conversation = build_conversation_text(task_data)
-    task_instructions = build_instructions_text(task_data)
-    questions_desc = build_questions_description(task_data)
-    json_schema = build_json_schema(task_data)
-
-    if task_type == "review":
-        intro = """You are reviewing another worker's evaluation of AI responses. 
+# Static pieces of the user prompt, chosen by task type (see _USER_PROMPT_TPL)
+_INTRO = {
+    "review": """You are reviewing another worker's evaluation of AI responses. 
 Their existing answers are shown with ✓ marks below. Read everything carefully, 
-then provide your own independent ratings AND assess the worker's quality."""
-    else:
-        intro = """Evaluate the following AI responses. Read the full conversation 
-and all instructions carefully, then answer every question below."""
+then provide your own independent ratings AND assess the worker's quality.""",
+    "fresh": """Evaluate the following AI responses. Read the full conversation 
+and all instructions carefully, then answer every question below.""",
+}
+_REVIEW_BLOCK = '''Since this is a Rate & Review, also include:
+- "worker_review_accuracy": "accurate | mostly_accurate | inaccurate"  
+- "worker_review_issues": ["list of specific issues with the worker's existing answers"]
+- "worker_review_recommendation": "approve | revise | reject"
+'''
 
-    return f"""{intro}
+_USER_PROMPT_BODY = """%(intro)s
 
-{conversation}
+%%(conversation)s
 
 ---
 
 ## Task-Specific Instructions (from the platform)
 
-{task_instructions}
+%%(task_instructions)s
 
 ---
 
-{questions_desc}
+%%(questions_desc)s
 
 ---
 
@@ -232,43 +240,181 @@ Answer every question listed above. For radio/select questions, pick EXACTLY ONE
 (use the exact text shown). For textarea questions, write your response. For checkbox questions, list 
 all that apply.
 
-{f'''Since this is a Rate & Review, also include:
-- "worker_review_accuracy": "accurate | mostly_accurate | inaccurate"  
-- "worker_review_issues": ["list of specific issues with the worker's existing answers"]
-- "worker_review_recommendation": "approve | revise | reject"
-''' if task_type == 'review' else ''}
+%(review_block)s
 Output as a JSON code block with this structure:
 
 ```json
-{json_schema}
+%%(json_schema)s
 ```
 
 Pick ONE value from each set of options. The justification must explain your reasoning with 
 specific quoted evidence from the responses — don't just restate ratings.
 """
+# One %-template per task type with the static parts already filled in,
+# leaving only the per-task sections as holes
+_USER_PROMPT_TPL = {
+    task_type: _USER_PROMPT_BODY % {
+        "intro": intro,
+        "review_block": _REVIEW_BLOCK if task_type == "review" else "",
+    }
+    for task_type, intro in _INTRO.items()
+}
+
+def build_user_prompt(task_data: dict, task_type: str = None) -> str:
+    """Build the complete user prompt — fully dynamic based on extracted data.
+
+    Callers that already ran detect_task_type() pass its result as task_type.
+    """
+    if task_type is None:
+        task_type = detect_task_type(task_data)
+    return _USER_PROMPT_TPL[task_type] % {
+        "conversation": build_conversation_text(task_data),
+        "task_instructions": build_instructions_text(task_data),
+        "questions_desc": build_questions_description(task_data),
+        "json_schema": build_json_schema(task_data),
+    }
+
+def _iter_fences(text: str):
+    """Bodies of the ```/```json fenced blocks in text, in order.
+
+    Same matches as re.finditer(r'```(?:json)?\\s*\\n(.*?)\\n```', text, re.DOTALL),
+    done with str.find so a long response is scanned once with no backtracking.
+    """
+    i = text.find("```")
+    while i >= 0:
+        p = i + 3
+        if text.startswith("json", p):
+            p += 4
+        q = p
+        while q < len(text) and text[q].isspace():
+            q += 1
+        # The body starts after the last newline in the whitespace run
+        nl = text.rfind("\n", p, q)
+        if nl >= 0:
+            j = text.find("\n```", nl + 1)
+            if j >= 0:
+                yield text[nl + 1:j]
+                i = text.find("```", j + 4)
+                continue
+            # Empty block: that newline is the closing fence's own
+            prev = text.rfind("\n", p, nl)
+            if prev >= 0 and text.startswith("```", nl + 1):
+                yield text[prev + 1:nl]
+                i = text.find("```", nl + 4)
+                continue
+            return
+        i = text.find("```", i + 1)
 
 def parse_json_from_response(text: str) -> dict:
     """Extract and parse JSON from Claude's response text."""
-    json_match = re.search(r'```(?:json)?\s*\n(.*?)\n```', text, re.DOTALL)
-    if json_match:
+    # A bare object is parsed as-is; only the fenced block is tried otherwise,
+    # so prose around a fence never costs a doomed whole-text parse
+    stripped = text.strip()
+    if stripped.startswith('{') and stripped.endswith('}'):
         try:
-            return json.loads(json_match.group(1))
-        except json.JSONDecodeError:
+            return orjson.loads(stripped)
+        except orjson.JSONDecodeError:
             pass
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        pass
+    # The answer is the first fenced block holding a JSON object; code the
+    # model quotes from a response before it is skipped
+    for fenced in _iter_fences(text):
+        try:
+            parsed = orjson.loads(fenced)
+        except orjson.JSONDecodeError:
+            continue
+        # Answers are looked up by key downstream, so only an object will do
+        if isinstance(parsed, dict):
+            return parsed
     return {"raw_response": text, "parse_error": True}
 
 
+def _load_instructions() -> str:
+    """General instructions from instructions.md, or '' if there is none."""
+    if INSTRUCTIONS_MD.exists():
+        return INSTRUCTIONS_MD.read_text(encoding="utf-8")
+    return ""
+
+
+@functools.lru_cache(maxsize=1)
+def _client():
+    """One shared client, so repeat calls reuse its warm connection pool."""
+    # Imported here: the SDK takes over a second to import and --dry-run,
+    # extraction-only runs and app startup never need it
+    from anthropic import Anthropic
+    return Anthropic(api_key=ANTHROPIC_API_KEY)
+
+
+def _message_params(system_prompt: str, user_prompt: str, task_type: str) -> dict:
+    """Message request arguments, shared by evaluate() and evaluate_batch()."""
+    # The system prompt only changes when instructions.md does, so mark it
+    # cacheable; repeat calls within the cache TTL read it at a fraction of
+    # the input price. The user prompt is per-task and left uncached.
+    # A prefix under the model's minimum cacheable length is silently not
+    # cached; _note_cache() warns when responses show that. (Checked with the
+    # bundled instructions.md, ~2k tokens: the default model does cache it.)
+    return {
+        "model": STYX_MODEL,
+        "max_tokens": MAX_TOKENS.get(task_type, 8192),
+        "system": [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}],
+        "messages": [{"role": "user", "content": user_prompt}],
+    }
+
+
+# (model, system prompt) → monotonic time a response last wrote or read the
+# prompt cache, or None if the latest response did neither
+_prompt_cache = {}
+# Default ephemeral cache lifetime; each read refreshes it
+_PROMPT_CACHE_TTL = 300.0
+
+def _note_cache(system_prompt: str, usage: dict) -> None:
+    """Record whether a response used the prompt cache; warn the first time it didn't."""
+    key = (STYX_MODEL, system_prompt)
+    if usage["cache_creation_input_tokens"] or usage["cache_read_input_tokens"]:
+        _prompt_cache[key] = time.monotonic()
+        return
+    if key not in _prompt_cache:
+        print("⚠  System prompt was not cached (shorter than the model's minimum cacheable prompt?)",
+              file=sys.stderr)
+    _prompt_cache[key] = None
+
+
+def _result_from_message(task_data: dict, task_type: str, message) -> dict:
+    """Shape a finished API message into the evaluation result dict."""
+    response_text = message.content[0].text
+    parsed = parse_json_from_response(response_text)
+    truncated = message.stop_reason == "max_tokens"
+    if truncated:
+        # Under the MAX_TOKENS budgets this is the usual cause of a parse
+        # error, so say so rather than leaving an unexplained one
+        budget = MAX_TOKENS.get(task_type, 8192)
+        print(f"⚠  Response hit max_tokens ({budget}) for a {task_type} task; "
+              f"raise MAX_TOKENS[{task_type!r}] if this recurs", file=sys.stderr)
+        if parsed.get("parse_error"):
+            parsed["truncated"] = True
+
+    return {
+        "task_type": task_type,
+        "model_used": STYX_MODEL,
+        "title": task_data.get("title", ""),
+        "evaluation": parsed,
+        "raw_response": response_text,
+        "stop_reason": message.stop_reason,
+        "truncated": truncated,
+        "usage": {
+            "input_tokens": message.usage.input_tokens,
+            "output_tokens": message.usage.output_tokens,
+            "cache_creation_input_tokens": message.usage.cache_creation_input_tokens or 0,
+            "cache_read_input_tokens": message.usage.cache_read_input_tokens or 0,
+        },
+    }
+
+
 def evaluate(task_data: dict = None, dry_run: bool = False) -> dict:
     """Main evaluation function."""
     if task_data is None:
         if not CURRENT_JSON.exists():
             return {"error": "current.json not found"}
-        with open(CURRENT_JSON, "r", encoding="utf-8") as f:
-            task_data = json.load(f)
+        task_data = orjson.loads(CURRENT_JSON.read_bytes())
 
     if isinstance(task_data, list):
         if not task_data:
@@ -276,14 +422,11 @@ def evaluate(task_data: dict = None, dry_run: bool = False) -> dict:
         task_data = task_data[0]
 
     # Load general instructions
-    instructions_md = ""
-    if INSTRUCTIONS_MD.exists():
-        with open(INSTRUCTIONS_MD, "r", encoding="utf-8") as f:
-            instructions_md = f.read()
+    instructions_md = _load_instructions()
 
     task_type = detect_task_type(task_data)
     system_prompt = build_system_prompt(instructions_md)
-    user_prompt = build_user_prompt(task_data)
+    user_prompt = build_user_prompt(task_data, task_type)
     if dry_run:
         return {
             "dry_run": True,
@@ -297,34 +440,151 @@ def evaluate(task_data: dict = None, dry_run: bool = False) -> dict:
     if not ANTHROPIC_API_KEY:
         return {"error": "ANTHROPIC_API_KEY not set. Create a .env file with your key."}
 
-    client = Anthropic(api_key=ANTHROPIC_API_KEY)
+    client = _client()
     print(f"🤖 Sending to {STYX_MODEL} ({task_type} evaluation)...", file=sys.stderr)
 
-    message = client.messages.create(
-        model=STYX_MODEL,
-        max_tokens=8192,
-        system=system_prompt,
-        messages=[{"role": "user", "content": user_prompt}],
-    )
+    # Streamed so the HTTP read is incremental rather than one long wait on a
+    # multi-thousand-token body; the SDK assembles the final message for us
+    with client.messages.stream(**_message_params(system_prompt, user_prompt, task_type)) as stream:
+        message = stream.get_final_message()
+    result = _result_from_message(task_data, task_type, message)
+    _note_cache(system_prompt, result["usage"])
+    return result
 
-    response_text = message.content[0].text
-    parsed = parse_json_from_response(response_text)
 
-    return {
-        "task_type": task_type,
-        "model_used": STYX_MODEL,
-        "title": task_data.get("title", ""),
-        "evaluation": parsed,
-        "raw_response": response_text,
-        "usage": {
-            "input_tokens": message.usage.input_tokens,
-            "output_tokens": message.usage.output_tokens,
-        },
-    }
+def evaluate_batch(task_datas: list, poll_interval: float = 30.0) -> list:
+    """Evaluate many tasks through the Message Batches API.
+
+    Batches are billed at half price but are not real-time (results can take
+    minutes to hours), so this is for queued/offline work; the watcher and
+    UI keep using evaluate(). Returns one result per task, in input order,
+    shaped like evaluate()'s, with {"error": ...} for requests that failed.
+    """
+    if not ANTHROPIC_API_KEY:
+        return [{"error": "ANTHROPIC_API_KEY not set. Create a .env file with your key."}] * len(task_datas)
+    if not task_datas:
+        return []
+
+    system_prompt = build_system_prompt(_load_instructions())
+    task_types = [detect_task_type(td) for td in task_datas]
+    requests = [
+        {"custom_id": f"task-{i}", "params": _message_params(system_prompt, build_user_prompt(td, task_types[i]), task_types[i])}
+        for i, td in enumerate(task_datas)
+    ]
+
+    client = _client()
+    batch = client.messages.batches.create(requests=requests)
+    print(f"📦 Submitted batch {batch.id} ({len(requests)} tasks) to {STYX_MODEL}", file=sys.stderr)
+    while batch.processing_status != "ended":
+        time.sleep(poll_interval)
+        batch = client.messages.batches.retrieve(batch.id)
+
+    results = [{"error": "No result returned for this task"}] * len(task_datas)
+    for entry in client.messages.batches.results(batch.id):
+        i = int(entry.custom_id.rsplit("-", 1)[1])
+        if entry.result.type == "succeeded":
+            results[i] = _result_from_message(task_datas[i], task_types[i], entry.result.message)
+            _note_cache(system_prompt, results[i]["usage"])
+        elif entry.result.type == "errored":
+            results[i] = {"error": entry.result.error.error.message}
+        else:
+            results[i] = {"error": f"Batch request {entry.result.type}"}
+    return results
+
+
+async def _evaluate_async(client, semaphore, system_prompt: str, task_data: dict) -> dict:
+    """One streamed evaluation on the shared async client, gated by semaphore."""
+    task_type = detect_task_type(task_data)
+    params = _message_params(system_prompt, build_user_prompt(task_data, task_type), task_type)
+    async with semaphore:
+        async with client.messages.stream(**params) as stream:
+            message = await stream.get_final_message()
+    result = _result_from_message(task_data, task_type, message)
+    _note_cache(system_prompt, result["usage"])
+    return result
+
+
+def evaluate_concurrent(task_datas: list, concurrency: int = 8) -> list:
+    """Evaluate many tasks in real time, up to `concurrency` requests in flight.
+
+    Full price but minutes rather than hours, unlike evaluate_batch(). Returns
+    one result per task, in input order, with {"error": ...} for failures.
+    """
+    if not ANTHROPIC_API_KEY:
+        return [{"error": "ANTHROPIC_API_KEY not set. Create a .env file with your key."}] * len(task_datas)
+    if not task_datas:
+        return []
+
+    from anthropic import AsyncAnthropic
+    system_prompt = build_system_prompt(_load_instructions())
+
+    async def run():
+        semaphore = asyncio.Semaphore(concurrency)
+        # The async client's connections belong to this event loop, so it
+        # lives for one run rather than being cached like _client()
+        async with AsyncAnthropic(api_key=ANTHROPIC_API_KEY) as client:
+            calls = [_evaluate_async(client, semaphore, system_prompt, td) for td in task_datas]
+            if not warm_first:
+                return await asyncio.gather(*calls, return_exceptions=True)
+            # Send the first task alone so it writes the system prompt cache
+            # the others then read, instead of every request paying to write it
+            first = await asyncio.gather(calls[0], return_exceptions=True)
+            return first + await asyncio.gather(*calls[1:], return_exceptions=True)
+
+    # Holding the others back for one request only pays off when an earlier
+    # response showed this prompt is cacheable and that cache has likely
+    # expired; unknown, uncacheable or still-warm prompts fan out at once
+    cached_at = _prompt_cache.get((STYX_MODEL, system_prompt))
+    warm_first = (len(task_datas) > 1 and cached_at is not None
+                  and time.monotonic() - cached_at > _PROMPT_CACHE_TTL)
+
+    print(f"🤖 Sending {len(task_datas)} tasks to {STYX_MODEL} ({concurrency} at a time)...", file=sys.stderr)
+    return [{"error": str(r) or type(r).__name__} if isinstance(r, Exception) else r for r in asyncio.run(run())]
+
+
+def _batch_main(task_dir: Path, realtime: bool = False) -> None:
+    """--batch: evaluate every task JSON in task_dir, writing X.result.json beside each X.json.
+
+    With realtime, uses evaluate_concurrent() instead of the Batches API.
+    """
+    files = sorted(p for p in task_dir.glob("*.json") if not p.name.endswith(".result.json"))
+    task_files, task_datas = [], []
+    for path in files:
+        task_data = orjson.loads(path.read_bytes())
+        if isinstance(task_data, list):
+            if not task_data:
+                print(f"⚠  Skipping empty {path.name}", file=sys.stderr)
+                continue
+            task_data = task_data[0]
+        task_files.append(path)
+        task_datas.append(task_data)
+    if not task_datas:
+        print(f"❌ No task JSON files in {task_dir}", file=sys.stderr)
+        sys.exit(1)
+
+    failed = 0
+    results = evaluate_concurrent(task_datas) if realtime else evaluate_batch(task_datas)
+    for path, result in zip(task_files, results):
+        if "error" in result:
+            failed += 1
+            print(f"❌ {path.name}: {result['error']}", file=sys.stderr)
+            continue
+        out = path.with_name(path.stem + ".result.json")
+        out.write_bytes(orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        print(f"✅ {path.name} → {out.name}", file=sys.stderr)
+    if failed:
+        sys.exit(1)
 
 
 def main():
     """CLI entry point."""
+    if "--batch" in sys.argv:
+        i = sys.argv.index("--batch")
+        if i + 1 >= len(sys.argv) or sys.argv[i + 1].startswith("--"):
+            print("Usage: task_evaluator.py --batch <dir of task JSON files> [--now]", file=sys.stderr)
+            sys.exit(2)
+        _batch_main(Path(sys.argv[i + 1]), realtime="--now" in sys.argv)
+        return
     dry_run = "--dry-run" in sys.argv
     if dry_run:
         print("🧪 Dry run — not calling the API\n", file=sys.stderr)
@@ -333,8 +593,7 @@ def main():
         print(f"❌ {result['error']}", file=sys.stderr)
         sys.exit(1)
     output_file = SCRIPT_DIR / "result.json"
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(result, f, indent=2, ensure_ascii=False)
+    output_file.write_bytes(orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
     print(f"✅ Saved to {output_file}", file=sys.stderr)
     if dry_run:
         print(f"System prompt: {result['system_prompt_length']} chars")
@@ -342,6 +601,8 @@ def main():
     else:
         print(f"Model: {result['model_used']}")
         print(f"Tokens: {result['usage']['input_tokens']} in / {result['usage']['output_tokens']} out")
+        if result["truncated"]:
+            print("⚠  Truncated at max_tokens")
         print(f"\n{result['raw_response']}")
 
 
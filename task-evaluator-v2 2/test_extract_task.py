@@ -0,0 +1,58 @@
+"""Extractor tests for extract_task: run with python -m unittest (or pytest).
+
+testdata/extract_page.html covers nested question divs, <label for>,
+comments, highlight classes and script/style/svg/template content; its
+expected output is testdata/extract_page.json. After an intended change to
+the output, regenerate the JSON and review the diff.
+"""
+
+import unittest
+from pathlib import Path
+
+import orjson
+
+import extract_task
+
+TESTDATA = Path(__file__).parent / "testdata"
+
+
+def _extract(name: str) -> dict:
+    result = extract_task.extract_from_html(str(TESTDATA / name))
+    result.pop("file")   # absolute path, differs per checkout
+    return result
+
+
+class ExtractPageTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.result = _extract("extract_page.html")
+
+    def test_matches_expected_json(self):
+        expected = orjson.loads((TESTDATA / "extract_page.json").read_bytes())
+        self.assertEqual(self.result, expected)
+
+    def test_no_script_style_or_template_text(self):
+        dumped = orjson.dumps(self.result).decode()
+        for leaked in ("mermaid", "font-family", "alert(", "tmpl", ".x{}", ".y{}", ".z{}", "s()", "x()"):
+            self.assertNotIn(leaked, dumped)
+
+    def test_text_after_a_script_is_kept(self):
+        self.assertIn("trailing tail text", self.result["conversation_parts"][0]["text"])
+
+    def test_label_for_beats_missing_enclosing_label(self):
+        pick = next(q for q in self.result["questions"] if q["label"] == "Pick")
+        self.assertEqual([o["label"] for o in pick["options"]], ["Alpha", "Beta"])
+        self.assertEqual(pick["selected"], ["Beta"])
+
+    def test_nested_question_inputs_belong_to_both_divs(self):
+        by_number = {q["number"]: q for q in self.result["questions"]}
+        self.assertEqual(by_number["6"]["selected"], "Yes")
+        self.assertEqual(by_number["7"]["selected"], "Yes")
+        self.assertEqual(by_number["7"]["text"], "Inner prompt")
+
+    def test_ghost_question_div_is_skipped(self):
+        self.assertNotIn("5", [q["number"] for q in self.result["questions"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+"""Server tests for task_app: run with python -m unittest (or pytest)."""
+
+import socket
+import threading
+import time
+import unittest
+import urllib.request
+
+from waitress.server import create_server
+
+import task_app
+
+
+def _open_stream(port: int) -> socket.socket:
+    """Start a GET /api/stream and never read the body, like a stalled tab."""
+    sock = socket.create_connection(("127.0.0.1", port), timeout=5)
+    sock.sendall(b"GET /api/stream HTTP/1.1\r\nHost: localhost\r\n\r\n")
+    return sock
+
+
+class StreamPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.server = create_server(task_app.app, host="127.0.0.1", port=0, **task_app.SERVE_OPTS)
+        self.port = self.server.effective_port
+        threading.Thread(target=self.server.run, daemon=True).start()
+        self.socks = []
+
+    def tearDown(self):
+        for sock in self.socks:
+            sock.close()
+        self.server.close()
+
+    def test_stalled_streams_do_not_block_status(self):
+        # One per worker thread: without the cap these would take them all
+        self.socks = [_open_stream(self.port) for _ in range(task_app.SERVE_OPTS["threads"])]
+        status_lines = [sock.recv(64).split(b"\r\n", 1)[0] for sock in self.socks]
+        self.assertEqual(sum(b" 200 " in line for line in status_lines), task_app.MAX_STREAMS)
+        self.assertTrue(all(b" 200 " in line or b" 503 " in line for line in status_lines))
+
+        with urllib.request.urlopen(f"http://127.0.0.1:{self.port}/api/status", timeout=3) as resp:
+            self.assertEqual(resp.status, 200)
+
+    def test_closed_streams_free_their_threads(self):
+        self.socks = [_open_stream(self.port) for _ in range(task_app.MAX_STREAMS)]
+        for sock in self.socks:
+            sock.recv(64)
+            sock.close()
+        deadline = time.monotonic() + 5
+        while task_app._open_streams and time.monotonic() < deadline:
+            time.sleep(0.1)
+        self.assertEqual(task_app._open_streams, 0)
+
+
+class BootIdTest(unittest.TestCase):
+    def test_state_carries_boot_id(self):
+        # Task ids restart at 0 with the process; the UI keys its caches on this
+        resp = task_app.app.test_client().get("/api/state")
+        self.assertEqual(resp.get_json()["boot"], task_app._history_boot)
+        self.assertIn(task_app._history_boot, resp.headers["ETag"])
+
+
+if __name__ == "__main__":
+    unittest.main()
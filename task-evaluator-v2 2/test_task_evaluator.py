@@ -0,0 +1,93 @@
+"""Response-handling tests for task_evaluator: run with python -m unittest (or pytest)."""
+
+import io
+import unittest
+from contextlib import redirect_stderr
+from types import SimpleNamespace
+
+import task_evaluator
+
+# A coding-task answer that quotes the response's code before giving the JSON
+PROSE_FENCE_RESPONSE = """Response A's helper never closes the file:
+
+```
+def load(path):
+    f = open(path)
+    return f.read()
+```
+
+Response B uses a context manager instead.
+
+```json
+{
+  "overall_quality": "Response B is better",
+  "justification": "A leaks the handle in `f = open(path)`."
+}
+```
+"""
+
+
+def _message(text: str, stop_reason: str = "end_turn") -> SimpleNamespace:
+    """Stand-in for a finished API message."""
+    usage = SimpleNamespace(input_tokens=1, output_tokens=1,
+                            cache_creation_input_tokens=None, cache_read_input_tokens=None)
+    return SimpleNamespace(content=[SimpleNamespace(text=text)], stop_reason=stop_reason, usage=usage)
+
+
+class ParseResponseTest(unittest.TestCase):
+    def test_prose_code_fence_before_json_block(self):
+        parsed = task_evaluator.parse_json_from_response(PROSE_FENCE_RESPONSE)
+        self.assertEqual(parsed["overall_quality"], "Response B is better")
+
+    def test_untagged_json_fence(self):
+        parsed = task_evaluator.parse_json_from_response('Here it is:\n```\n{"a": 1}\n```\n')
+        self.assertEqual(parsed, {"a": 1})
+
+    def test_no_object_is_a_parse_error(self):
+        parsed = task_evaluator.parse_json_from_response("```\nprint('hi')\n```\n```json\n[1, 2]\n```")
+        self.assertTrue(parsed["parse_error"])
+
+    def test_no_stop_sequences(self):
+        # Any fence-shaped stop sequence also matches fences before the answer
+        for task_type in ("fresh", "review"):
+            self.assertNotIn("stop_sequences", task_evaluator._message_params("system", "user", task_type))
+
+    def test_result_from_message(self):
+        result = task_evaluator._result_from_message({"title": "T"}, "fresh", _message(PROSE_FENCE_RESPONSE))
+        self.assertNotIn("parse_error", result["evaluation"])
+        self.assertEqual(result["raw_response"], PROSE_FENCE_RESPONSE)
+        self.assertEqual(result["usage"]["cache_read_input_tokens"], 0)
+        self.assertEqual(result["stop_reason"], "end_turn")
+        self.assertFalse(result["truncated"])
+
+    def test_max_tokens_truncation_is_reported(self):
+        cut = PROSE_FENCE_RESPONSE[:PROSE_FENCE_RESPONSE.index('"justification"')]
+        with redirect_stderr(io.StringIO()) as err:
+            result = task_evaluator._result_from_message({}, "review", _message(cut, "max_tokens"))
+        self.assertTrue(result["truncated"])
+        self.assertEqual(result["stop_reason"], "max_tokens")
+        self.assertTrue(result["evaluation"]["parse_error"])
+        self.assertTrue(result["evaluation"]["truncated"])
+        self.assertIn("max_tokens (6144)", err.getvalue())
+
+
+class PromptCacheTest(unittest.TestCase):
+    def setUp(self):
+        task_evaluator._prompt_cache.clear()
+
+    def test_uncached_response_warns_once(self):
+        usage = {"cache_creation_input_tokens": 0, "cache_read_input_tokens": 0}
+        err = io.StringIO()
+        with redirect_stderr(err):
+            task_evaluator._note_cache("short prompt", usage)
+            task_evaluator._note_cache("short prompt", usage)
+        self.assertEqual(err.getvalue().count("not cached"), 1)
+        self.assertIsNone(task_evaluator._prompt_cache[(task_evaluator.STYX_MODEL, "short prompt")])
+
+    def test_cache_write_is_recorded(self):
+        task_evaluator._note_cache("long prompt", {"cache_creation_input_tokens": 2048, "cache_read_input_tokens": 0})
+        self.assertIsNotNone(task_evaluator._prompt_cache[(task_evaluator.STYX_MODEL, "long prompt")])
+
+
+if __name__ == "__main__":
+    unittest.main()